@@ -3,13 +3,22 @@ Simple congestion simulation for Fluxora prototype.
 
 This is NOT a real ML model – it just:
 - Keeps a congestion factor per road
-- Randomly updates values between 1.0 and 2.0
+- Randomly updates values between 1.0 and 2.0, unless a live feed
+  (ingestion.py) is publishing real values
+- Appends every update to a time-series store, so confidence can be
+  based on the rolling variance of recent values
 """
 
 from __future__ import annotations
 
+import os
 import random
-from typing import Dict, List
+import tempfile
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from congestion_store import CongestionStore
 
 
 # Global dictionary holding congestion factor per road.
@@ -31,6 +40,49 @@ LOCATION_NAMES = {
     "D": "Velachery"
 }
 
+# Approximate (lat, lon) of each location, used to map-match probe pings
+LOCATION_COORDS = {
+    "A": (13.0850, 80.2101),
+    "B": (13.0418, 80.2341),
+    "C": (13.0067, 80.2206),
+    "D": (12.9815, 80.2180),
+}
+
+
+# Rolling window and thresholds for confidence. Thresholds are on the
+# coefficient of variation (std / mean) of the factor: the uniform [1, 2]
+# simulation has CV (1 / sqrt(12)) / 1.5 ~= 0.19, so it lands mid-band in
+# Medium (short windows spread into High/Low); a feed that holds steady
+# within ~15% reads High and one swinging well beyond the simulated noise
+# reads Low
+CONFIDENCE_WINDOW_SECONDS = 15 * 60
+CONFIDENCE_MIN_SAMPLES = 5
+HIGH_CONFIDENCE_CV = 0.15
+MEDIUM_CONFIDENCE_CV = 0.25
+
+# History of ROAD_CONGESTION, one row per update (columns follow ROAD_CONGESTION order)
+CONGESTION_STORE = CongestionStore(
+    list(ROAD_CONGESTION),
+    os.getenv("FLUXORA_CONGESTION_STORE_DIR", os.path.join(tempfile.gettempdir(), "fluxora-congestion")),
+    dtype=os.getenv("FLUXORA_CONGESTION_STORE_DTYPE", "float16"),
+)
+
+
+# Set while an ingestion pipeline publishes real congestion; the random
+# simulation then stays out of ROAD_CONGESTION and the history store
+live_feed_active = False
+
+
+def set_live_feed(active: bool) -> None:
+    """Mark whether a live ingestion feed owns ROAD_CONGESTION."""
+    global live_feed_active
+    live_feed_active = active
+
+
+def record_congestion_snapshot(ts: Optional[float] = None) -> None:
+    """Append the current ROAD_CONGESTION values to the history store."""
+    CONGESTION_STORE.append(list(ROAD_CONGESTION.values()), ts)
+
 
 def update_congestion() -> None:
     """
@@ -39,11 +91,17 @@ def update_congestion() -> None:
     - Each road gets a new value in [1.0, 2.0]
     - We round to 2 decimal places for readability
     - This simulates changing traffic conditions in a simple way
+    - No-op while a live feed is active (see set_live_feed)
     """
+    if live_feed_active:
+        return
+
     for road in ROAD_CONGESTION:
         new_value = random.uniform(1.0, 2.0)
         ROAD_CONGESTION[road] = round(new_value, 2)
 
+    record_congestion_snapshot()
+
 
 def get_congestion(road_name: str) -> float:
     """
@@ -62,18 +120,60 @@ def get_congestion_confidence(road_name: str) -> str:
     - High: congestion values are stable (low variance)
     - Medium: moderate variance in recent updates
     - Low: high volatility or insufficient data
+
+    Spread is the coefficient of variation (std / mean) over the last
+    CONFIDENCE_WINDOW_SECONDS of history.
     """
-    congestion_value = ROAD_CONGESTION.get(road_name, 1.0)
-    
-    # Simple heuristic based on congestion level
-    if congestion_value < 1.3:
+    if road_name not in CONGESTION_STORE.road_index:
+        return "Low"
+
+    cv = CONGESTION_STORE.rolling_cv(CONFIDENCE_WINDOW_SECONDS, CONFIDENCE_MIN_SAMPLES)
+    road_cv = float(cv[CONGESTION_STORE.road_index[road_name]])
+
+    if road_cv != road_cv:  # NaN: not enough samples yet
+        return "Low"
+    if road_cv < HIGH_CONFIDENCE_CV:
         return "High"
-    elif congestion_value < 1.6:
+    elif road_cv < MEDIUM_CONFIDENCE_CV:
         return "Medium"
     else:
         return "Low"
 
 
+def get_congestion_history(
+    start: float, end: float, road_name: Optional[str] = None, resolution: str = "raw"
+) -> Dict[str, Any]:
+    """
+    Return congestion history between two unix timestamps.
+
+    - resolution "raw" returns every recorded tick
+    - "minute" / "hour" return rolled-up mean/std/min/max per bucket
+    """
+    roads = [road_name] if road_name else list(ROAD_CONGESTION)
+    if resolution == "raw":
+        timestamps, values = CONGESTION_STORE.range(start, end, roads)
+        return {
+            "resolution": resolution,
+            "timestamps": timestamps.tolist(),
+            "roads": {road: values[:, i].astype(np.float64).round(3).tolist() for i, road in enumerate(roads)},
+        }
+
+    rollup = CONGESTION_STORE.aggregates(start, end, resolution, roads)
+    return {
+        "resolution": resolution,
+        "timestamps": rollup["bucket_start"].tolist(),
+        "count": rollup["count"].tolist(),
+        "roads": {
+            road: {
+                # min/max are float32; widen before rounding so JSON gets 1.13, not 1.1299999952316284
+                stat: rollup[stat][:, i].astype(np.float64).round(3).tolist()
+                for stat in ("mean", "std", "min", "max")
+            }
+            for i, road in enumerate(roads)
+        },
+    }
+
+
 def get_heatmap_data() -> List[Dict[str, Union[float, str]]]:
     """
     Return a list of {road, congestion, confidence} objects for UI heatmaps.
@@ -104,5 +204,16 @@ def get_heatmap_data() -> List[Dict[str, Union[float, str]]]:
     ]
 
 
-__all__ = ["ROAD_CONGESTION", "update_congestion", "get_congestion", "get_congestion_confidence", "get_heatmap_data"]
+__all__ = [
+    "ROAD_CONGESTION",
+    "LOCATION_COORDS",
+    "CONGESTION_STORE",
+    "update_congestion",
+    "set_live_feed",
+    "record_congestion_snapshot",
+    "get_congestion",
+    "get_congestion_confidence",
+    "get_congestion_history",
+    "get_heatmap_data",
+]
 
@@ -0,0 +1,403 @@
+"""
+Columnar congestion time-series store for Fluxora prototype.
+
+- Every tick appends one row (a congestion value per road) to fixed-size
+  chunks memory-mapped on disk (float16 by default) plus a float64
+  timestamp column
+- Ticks are rolled up into minute and hour aggregates
+  (count/sum/sum of squares/min/max per road) kept in memory-mapped ring
+  buffers next to the raw chunks, so they survive restarts
+- Range and per-road queries binary-search the timestamp columns
+- Retention: raw chunks older than RAW_RETENTION_SECONDS (or beyond
+  MAX_RAW_CHUNKS) are deleted, and rollup rings have a fixed capacity,
+  so the footprint stays bounded
+
+Single writer per directory, enforced with a lock file: a second process
+opening a directory that is already in use (another uvicorn worker, the
+replay or ingestion CLI) gets a private temporary directory instead.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # no advisory locks (Windows): single process assumed
+    fcntl = None
+
+
+# Rows per raw chunk file
+CHUNK_TICKS = 4096
+
+# Raw tick retention
+RAW_RETENTION_SECONDS = 6 * 3600
+MAX_RAW_CHUNKS = 64
+
+# Rollup ring sizes (7 days of minutes, 90 days of hours)
+MINUTE_RETENTION = 7 * 24 * 60
+HOUR_RETENTION = 90 * 24
+
+# Rolling statistics are recomputed at least this often, so they age out
+# of the window even when no new ticks arrive
+ROLLING_CACHE_SECONDS = 10.0
+
+_CHUNK_FILE = re.compile(r"^raw_(\d{8})\.ts$")
+_LOCK_FILE = ".lock"
+
+
+class _Chunk:
+    """One memory-mapped raw chunk: timestamps (N,) and values (N, roads)."""
+
+    __slots__ = ("chunk_id", "timestamps", "values", "rows", "ts_path", "values_path")
+
+    def __init__(self, directory: str, chunk_id: int, num_roads: int, dtype: np.dtype) -> None:
+        self.chunk_id = chunk_id
+        self.ts_path = os.path.join(directory, f"raw_{chunk_id:08d}.ts")
+        self.values_path = os.path.join(directory, f"raw_{chunk_id:08d}.values")
+        exists = (
+            os.path.exists(self.ts_path)
+            and os.path.exists(self.values_path)
+            # Files from a different chunk size / road set are not reusable
+            and os.path.getsize(self.ts_path) == CHUNK_TICKS * 8
+            and os.path.getsize(self.values_path) == CHUNK_TICKS * num_roads * np.dtype(dtype).itemsize
+        )
+        mode = "r+" if exists else "w+"
+        self.timestamps = np.memmap(self.ts_path, dtype=np.float64, mode=mode, shape=(CHUNK_TICKS,))
+        self.values = np.memmap(self.values_path, dtype=dtype, mode=mode, shape=(CHUNK_TICKS, num_roads))
+        if exists:
+            # Unwritten rows keep their NaN timestamp
+            self.rows = int(np.count_nonzero(~np.isnan(self.timestamps)))
+        else:
+            self.timestamps[:] = np.nan
+            self.rows = 0
+
+    @property
+    def first_ts(self) -> float:
+        return float(self.timestamps[0]) if self.rows else float("inf")
+
+    @property
+    def last_ts(self) -> float:
+        return float(self.timestamps[self.rows - 1]) if self.rows else float("-inf")
+
+    def slice(self, start: float, end: float) -> Tuple[np.ndarray, np.ndarray]:
+        ts = self.timestamps[: self.rows]
+        lo = int(np.searchsorted(ts, start, side="left"))
+        hi = int(np.searchsorted(ts, end, side="right"))
+        return ts[lo:hi], self.values[lo:hi]
+
+    def delete(self) -> None:
+        del self.timestamps, self.values
+        for path in (self.ts_path, self.values_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class _Rollup:
+    """
+    Fixed-capacity ring of per-bucket aggregates for every road.
+
+    Arrays are memory-mapped files ("<name>_<field>.bin") next to the raw
+    chunks, so rollups outlive raw retention and process restarts; the
+    write slot is recovered from the newest bucket start.
+    """
+
+    # field -> (dtype, per-road column)
+    _FIELDS = {
+        "starts": (np.float64, False),
+        "count": (np.int64, False),
+        "sum": (np.float64, True),
+        "sumsq": (np.float64, True),
+        "min": (np.float32, True),
+        "max": (np.float32, True),
+    }
+
+    def __init__(self, directory: str, name: str, bucket_seconds: int, capacity: int, num_roads: int) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        arrays = {}
+        for field, (dtype, per_road) in self._FIELDS.items():
+            shape = (capacity, num_roads) if per_road else (capacity,)
+            path = os.path.join(directory, f"{name}_{field}.bin")
+            exists = os.path.exists(path) and os.path.getsize(path) == int(np.prod(shape)) * np.dtype(dtype).itemsize
+            arrays[field] = np.memmap(path, dtype=dtype, mode="r+" if exists else "w+", shape=shape)
+        self.starts = arrays["starts"]
+        self.count = arrays["count"]
+        self.sum = arrays["sum"]
+        self.sumsq = arrays["sumsq"]
+        self.min = arrays["min"]
+        self.max = arrays["max"]
+
+        valid = ~np.isnan(self.starts) & (self.count > 0)
+        if not valid.any():
+            # Fresh ring (a new file reads as zeros, so mark every slot empty)
+            self.starts[:] = np.nan
+            self.count[:] = 0
+            self._slot = -1
+            self._current_start = None
+        else:
+            self.starts[~valid] = np.nan
+            self._slot = int(np.nanargmax(self.starts))
+            self._current_start = float(self.starts[self._slot])
+
+    def add(self, ts: float, row: np.ndarray) -> None:
+        start = ts - (ts % self.bucket_seconds)
+        if start != self._current_start:
+            self._slot = (self._slot + 1) % self.capacity
+            slot = self._slot
+            self.starts[slot] = start
+            self.count[slot] = 0
+            self.sum[slot] = 0.0
+            self.sumsq[slot] = 0.0
+            self.min[slot] = row
+            self.max[slot] = row
+            self._current_start = start
+        slot = self._slot
+        self.count[slot] += 1
+        self.sum[slot] += row
+        self.sumsq[slot] += row * row
+        np.minimum(self.min[slot], row, out=self.min[slot])
+        np.maximum(self.max[slot], row, out=self.max[slot])
+
+    def flush(self) -> None:
+        for array in (self.starts, self.count, self.sum, self.sumsq, self.min, self.max):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def query(self, start: float, end: float, columns: np.ndarray) -> Dict[str, np.ndarray]:
+        valid = ~np.isnan(self.starts) & (self.starts >= start - self.bucket_seconds) & (self.starts <= end)
+        slots = np.flatnonzero(valid)
+        slots = slots[np.argsort(self.starts[slots])]
+        count = self.count[slots].astype(np.float64)[:, None]
+        mean = self.sum[slots][:, columns] / count
+        variance = np.maximum(self.sumsq[slots][:, columns] / count - mean * mean, 0.0)
+        return {
+            "bucket_start": self.starts[slots],
+            "count": self.count[slots],
+            "mean": mean,
+            "std": np.sqrt(variance),
+            "min": self.min[slots][:, columns],
+            "max": self.max[slots][:, columns],
+        }
+
+
+class CongestionStore:
+    """Append-only per-road congestion history with range queries."""
+
+    def __init__(
+        self,
+        roads: Sequence[str],
+        directory: str,
+        dtype: str = "float16",
+        raw_retention_seconds: float = RAW_RETENTION_SECONDS,
+        max_raw_chunks: int = MAX_RAW_CHUNKS,
+    ) -> None:
+        self.roads = list(roads)
+        self.road_index = {road: i for i, road in enumerate(self.roads)}
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.raw_retention_seconds = raw_retention_seconds
+        self.max_raw_chunks = max_raw_chunks
+        self.minutes: Optional[_Rollup] = None  # mapped in _open
+        self.hours: Optional[_Rollup] = None
+        self.private = False  # True if directory was taken and we fell back to a temp dir
+        self.ticks = 0  # appended since start; used to key derived caches
+        self._chunks: List[_Chunk] = []
+        self._opened = False
+        self._lock = threading.Lock()
+        self._lock_handle = None
+        self._rolling_cache: Tuple[Hashable, Tuple[np.ndarray, np.ndarray]] = (None, (np.zeros(0), np.zeros(0)))
+
+    def _acquire_directory(self, directory: str) -> bool:
+        """Take the directory's lock file; False if another process holds it."""
+        os.makedirs(directory, exist_ok=True)
+        if fcntl is None:
+            return True
+        handle = open(os.path.join(directory, _LOCK_FILE), "a+")
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._lock_handle = handle
+        return True
+
+    def _open(self) -> None:
+        """Lock the directory, map existing chunks and rollups (first use only)."""
+        if not self._acquire_directory(self.directory):
+            self.directory = tempfile.mkdtemp(prefix="fluxora-congestion-")
+            self.private = True
+            atexit.register(shutil.rmtree, self.directory, True)
+            self._acquire_directory(self.directory)
+        ids = sorted(
+            int(match.group(1))
+            for match in (_CHUNK_FILE.match(name) for name in os.listdir(self.directory))
+            if match
+        )
+        self._chunks = [_Chunk(self.directory, i, len(self.roads), self.dtype) for i in ids]
+        self.minutes = _Rollup(self.directory, "minute", 60, MINUTE_RETENTION, len(self.roads))
+        self.hours = _Rollup(self.directory, "hour", 3600, HOUR_RETENTION, len(self.roads))
+        self._opened = True
+
+    def _writable_chunk(self) -> _Chunk:
+        if self._chunks and self._chunks[-1].rows < CHUNK_TICKS:
+            return self._chunks[-1]
+        if self._chunks:
+            self._chunks[-1].timestamps.flush()
+            self._chunks[-1].values.flush()
+            self.minutes.flush()
+            self.hours.flush()
+        next_id = self._chunks[-1].chunk_id + 1 if self._chunks else 0
+        chunk = _Chunk(self.directory, next_id, len(self.roads), self.dtype)
+        self._chunks.append(chunk)
+        return chunk
+
+    def _enforce_retention(self, now: float) -> None:
+        cutoff = now - self.raw_retention_seconds
+        while len(self._chunks) > 1 and (
+            len(self._chunks) > self.max_raw_chunks or self._chunks[0].last_ts < cutoff
+        ):
+            self._chunks.pop(0).delete()
+
+    def append(self, values: Sequence[float], ts: Optional[float] = None) -> None:
+        """Append one tick of per-road congestion values (in road order)."""
+        ts = time.time() if ts is None else ts
+        row = np.asarray(values, dtype=np.float64)
+        with self._lock:
+            if not self._opened:
+                self._open()
+            chunk = self._writable_chunk()
+            if chunk.rows and ts < chunk.last_ts:
+                ts = chunk.last_ts  # keep timestamps monotonic for searchsorted
+            chunk.values[chunk.rows] = row
+            chunk.timestamps[chunk.rows] = ts
+            chunk.rows += 1
+            self.minutes.add(ts, row)
+            self.hours.add(ts, row)
+            self.ticks += 1
+            if chunk.rows == CHUNK_TICKS:
+                self._enforce_retention(ts)
+
+    def _columns(self, roads: Optional[Sequence[str]]) -> np.ndarray:
+        if roads is None:
+            return np.arange(len(self.roads))
+        return np.array([self.road_index[road] for road in roads], dtype=np.intp)
+
+    def range(
+        self, start: float, end: float, roads: Optional[Sequence[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Raw ticks in [start, end]: (timestamps (T,), values (T, len(roads)))."""
+        columns = self._columns(roads)
+        with self._lock:
+            if not self._opened:
+                self._open()
+            parts = [
+                chunk.slice(start, end)
+                for chunk in self._chunks
+                if chunk.rows and chunk.last_ts >= start and chunk.first_ts <= end
+            ]
+            if not parts:
+                return np.zeros(0), np.zeros((0, len(columns)), dtype=np.float32)
+            timestamps = np.concatenate([ts for ts, _ in parts])
+            values = np.concatenate([vals[:, columns] for _, vals in parts]).astype(np.float32)
+        return timestamps, values
+
+    def road_series(self, road: str, start: float, end: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Raw ticks for a single road in [start, end]."""
+        timestamps, values = self.range(start, end, [road])
+        return timestamps, values[:, 0]
+
+    def aggregates(
+        self,
+        start: float,
+        end: float,
+        resolution: str = "minute",
+        roads: Optional[Sequence[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Minute or hour rollups overlapping [start, end]."""
+        with self._lock:
+            if not self._opened:
+                self._open()
+            rollup = {"minute": self.minutes, "hour": self.hours}[resolution]
+            return rollup.query(start, end, self._columns(roads))
+
+    def _rolling(self, window_seconds: float, min_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-road (mean, std) over the last window_seconds, cached until the
+        next append or the next ROLLING_CACHE_SECONDS time bucket.
+        """
+        now = time.time()
+        with self._lock:
+            key = (self.ticks, window_seconds, min_samples, int(now // ROLLING_CACHE_SECONDS))
+            cached_key, cached = self._rolling_cache
+        if cached_key == key:
+            return cached
+        _, values = self.range(now - window_seconds, now)
+        if values.shape[0] < min_samples:
+            mean = std = np.full(len(self.roads), np.nan)
+        else:
+            values = values.astype(np.float64)
+            mean, std = values.mean(axis=0), values.std(axis=0)
+        with self._lock:
+            self._rolling_cache = (key, (mean, std))
+        return mean, std
+
+    def rolling_std(self, window_seconds: float, min_samples: int) -> np.ndarray:
+        """
+        Per-road standard deviation over the last window_seconds.
+
+        Returns NaN for roads with fewer than min_samples ticks. Cached
+        until the next append or for up to ROLLING_CACHE_SECONDS.
+        """
+        return self._rolling(window_seconds, min_samples)[1]
+
+    def rolling_cv(self, window_seconds: float, min_samples: int) -> np.ndarray:
+        """Per-road coefficient of variation (std / mean) over the last window_seconds."""
+        mean, std = self._rolling(window_seconds, min_samples)
+        return std / np.maximum(mean, 1e-9)
+
+    def close(self) -> None:
+        """Flush mapped files and release the directory lock."""
+        with self._lock:
+            if self._opened:
+                for chunk in self._chunks:
+                    chunk.timestamps.flush()
+                    chunk.values.flush()
+                self.minutes.flush()
+                self.hours.flush()
+            if self._lock_handle is not None:
+                self._lock_handle.close()
+                self._lock_handle = None
+            self._chunks = []
+            self._opened = False
+
+    def stats(self) -> Dict[str, object]:
+        """Footprint and retention summary."""
+        with self._lock:
+            if not self._opened:
+                self._open()
+            rows = sum(chunk.rows for chunk in self._chunks)
+            return {
+                "directory": self.directory,
+                "private": self.private,
+                "roads": len(self.roads),
+                "raw_chunks": len(self._chunks),
+                "raw_ticks": rows,
+                "raw_bytes": len(self._chunks) * CHUNK_TICKS * (8 + len(self.roads) * self.dtype.itemsize),
+                "oldest_tick": min(chunk.first_ts for chunk in self._chunks) if rows else None,
+                "newest_tick": max(chunk.last_ts for chunk in self._chunks) if rows else None,
+            }
+
+
+__all__ = ["CongestionStore", "CHUNK_TICKS"]
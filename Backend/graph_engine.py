@@ -4,14 +4,32 @@ Graph engine for Fluxora prototype.
 - Uses a small hardcoded directed city graph
 - Each edge has a base travel time and a congestion factor
 - Route cost is: base_time * congestion_factor
+- Optional load-aware mode adds a marginal-cost penalty for flow already
+  assigned to each edge, so concurrent users get spread over alternatives
+- Results are cached per (congestion version, load version)
+- The graph is populated by load_graph(), called from the app lifespan
+  preload or lazily on first use
+- Searches run over flat per-edge arrays and produce compact RouteResult
+  objects; node labels are only built when a route is serialized
+- get_pareto_routes returns the trade-off front of time, congestion
+  exposure and estimated CO2
 """
 
 from __future__ import annotations
 
-from typing import Dict, List, Union
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple, Union
+import heapq
+import itertools
 import random
+import threading
 
 import networkx as nx
+import numpy as np
+
+from load_balancer import EdgeLoadTracker, LoadSnapshot
+from pareto import DEFAULT_EPSILON, ParetoPath, pareto_search, select_diverse
+from route_cache import LOAD_AWARE_CACHE, ROUTE_CACHE
+from route_result import RouteResult
 
 
 # Create a directed graph (one-way roads)
@@ -25,7 +43,12 @@ CRITICAL_ZONES = ["C", "D"]  # Guindy, Velachery (major commercial areas)
 
 # Hardcoded city nodes (Chennai locations)
 NODES = ["A", "B", "C", "D"]  # Anna Nagar, T Nagar, Guindy, Velachery
-G.add_nodes_from(NODES)
+
+# Simple emission model for Pareto routing: distance is estimated from
+# base_time at free-flow speed, and stop-and-go traffic raises emissions
+FREE_FLOW_SPEED_KMH = 30.0
+CO2_KG_PER_KM = 0.17  # average passenger car
+CO2_CONGESTION_FACTOR = 0.6  # extra emissions per unit of congestion above 1.0
 
 # Add directed edges with base_time (minutes) and congestion_factor
 # Chennai road network with realistic travel times
@@ -46,25 +69,281 @@ EDGES = [
     ("D", "A", {"base_time": 20, "congestion_factor": 1.37}),
 ]
 
-G.add_edges_from(EDGES)
+_graph_loaded = False
+_graph_lock = threading.Lock()
 
+# Stable integer id per node / directed edge (edge ids index every per-edge array)
+NODE_INDEX: Dict[str, int] = {node: i for i, node in enumerate(NODES)}
+EDGE_INDEX: Dict[Tuple[str, str], int] = {(u, v): i for i, (u, v, _) in enumerate(EDGES)}
+
+# Flat per-edge arrays of the routing snapshot (filled by load_graph)
+EDGE_SOURCE = np.zeros(0, dtype=np.int32)
+EDGE_TARGET = np.zeros(0, dtype=np.int32)
+EDGE_BASE_TIME = np.zeros(0, dtype=np.float64)
+EDGE_CRITICAL = np.zeros(0, dtype=bool)
+
+
+class EdgeState(NamedTuple):
+    """Live per-edge congestion and the travel times derived from it."""
+
+    congestion: np.ndarray
+    time: np.ndarray  # base_time * congestion_factor
 
-def _edge_weight(u: str, v: str, data: Dict) -> float:
-    """Compute weight for a single edge using base_time * congestion_factor."""
-    base_time = data.get("base_time", 0)
-    congestion_factor = data.get("congestion_factor", 1.0)
-    
-    # Apply emergency mode penalties for critical zones
-    if emergency_mode and (v in CRITICAL_ZONES or u in CRITICAL_ZONES):
-        congestion_factor *= 1.5  # Increase congestion penalty by 50%
-    
-    return base_time * congestion_factor
+
+# Swapped as one object on every congestion update, so a reader that takes
+# EDGE_STATE once never mixes arrays from two different updates
+EDGE_STATE = EdgeState(np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64))
+
+# Outgoing edge ids per node id, plus plain-list copies for the search loop
+_OUT_EDGES: List[List[int]] = []
+_EDGE_SOURCE_LIST: List[int] = []
+_EDGE_TARGET_LIST: List[int] = []
+
+
+def load_graph() -> None:
+    """
+    Populate G and the per-edge arrays with the city network (idempotent).
+
+    Kept out of import time so the API process can answer /health
+    before the graph snapshot is built.
+    """
+    global _graph_loaded, EDGE_SOURCE, EDGE_TARGET, EDGE_BASE_TIME, EDGE_STATE, EDGE_CRITICAL
+    global _OUT_EDGES, _EDGE_SOURCE_LIST, _EDGE_TARGET_LIST
+    if _graph_loaded:
+        return
+    with _graph_lock:
+        if _graph_loaded:
+            return
+        G.add_nodes_from(NODES)
+        G.add_edges_from(EDGES)
+
+        _EDGE_SOURCE_LIST = [NODE_INDEX[u] for u, _, _ in EDGES]
+        _EDGE_TARGET_LIST = [NODE_INDEX[v] for _, v, _ in EDGES]
+        _OUT_EDGES = [[] for _ in NODES]
+        for edge_id, source_id in enumerate(_EDGE_SOURCE_LIST):
+            _OUT_EDGES[source_id].append(edge_id)
+
+        EDGE_SOURCE = np.array(_EDGE_SOURCE_LIST, dtype=np.int32)
+        EDGE_TARGET = np.array(_EDGE_TARGET_LIST, dtype=np.int32)
+        EDGE_BASE_TIME = np.array([d.get("base_time", 0) for _, _, d in EDGES], dtype=np.float64)
+        congestion = np.array([d.get("congestion_factor", 1.0) for _, _, d in EDGES], dtype=np.float64)
+        EDGE_STATE = EdgeState(congestion, EDGE_BASE_TIME * congestion)
+        EDGE_CRITICAL = np.array(
+            [u in CRITICAL_ZONES or v in CRITICAL_ZONES for u, v, _ in EDGES], dtype=bool
+        )
+        _graph_loaded = True
+
+
+# Bumped whenever edge weights change so cached routes become unreachable
+congestion_version = 0
+
+# Guards every change of (EDGE_STATE, emergency_mode) together with its
+# version bump, and consistent reads of all three
+_state_lock = threading.Lock()
+
+# Called with the new version after every bump (e.g. to re-warm the cache)
+_version_listeners: List[Callable[[int], None]] = []
+
+# Recently assigned flow per edge, used by load-aware routing
+LOAD_TRACKER = EdgeLoadTracker(len(EDGES))
+
+
+def _edge_weights(
+    snapshot: Optional[LoadSnapshot] = None,
+    congestion: Optional[np.ndarray] = None,
+    emergency: Optional[bool] = None,
+) -> np.ndarray:
+    """
+    Per-edge weights base_time * congestion_factor, vectorized.
+
+    - Emergency mode raises the congestion factor by 50% near critical zones
+    - A load snapshot multiplies each weight by the marginal cost of its flow
+    - congestion / emergency override the live values (used for forecasts
+      and for computations pinned to one routing state)
+    """
+    congestion = EDGE_STATE.congestion if congestion is None else congestion
+    emergency = emergency_mode if emergency is None else emergency
+    if emergency:
+        congestion = np.where(EDGE_CRITICAL, congestion * 1.5, congestion)
+    weights = EDGE_BASE_TIME * congestion
+    if snapshot is not None:
+        weights = weights * snapshot.multipliers
+    return weights
+
+
+def _dijkstra(source_id: int, target_id: int, weights: List[float]) -> Optional[np.ndarray]:
+    """
+    Dijkstra over the edge arrays; returns the path as edge ids or None.
+
+    Hop counts are tracked alongside predecessors so backtracking fills a
+    preallocated edge-id array in a single pass.
+    """
+    n = len(_OUT_EDGES)
+    dist = [float("inf")] * n
+    pred = [-1] * n
+    hops = [0] * n
+    done = [False] * n
+    dist[source_id] = 0.0
+    counter = itertools.count()
+    heap = [(0.0, next(counter), source_id)]
+    targets = _EDGE_TARGET_LIST
+
+    while heap:
+        d, _, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        if u == target_id:
+            break
+        for edge_id in _OUT_EDGES[u]:
+            v = targets[edge_id]
+            nd = d + weights[edge_id]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = edge_id
+                hops[v] = hops[u] + 1
+                heapq.heappush(heap, (nd, next(counter), v))
+
+    if not done[target_id]:
+        return None
+
+    edge_ids = np.empty(hops[target_id], dtype=np.int32)
+    node = target_id
+    for i in range(hops[target_id] - 1, -1, -1):
+        edge_id = pred[node]
+        edge_ids[i] = edge_id
+        node = _EDGE_SOURCE_LIST[edge_id]
+    return edge_ids
+
+
+def _search(
+    source: str,
+    destination: str,
+    weights: np.ndarray,
+    strategy: Optional[str] = None,
+    congestion: Optional[np.ndarray] = None,
+) -> Optional[RouteResult]:
+    """Run Dijkstra with the given weights and wrap the path as a RouteResult."""
+    source_id = NODE_INDEX[source]
+    edge_ids = _dijkstra(source_id, NODE_INDEX[destination], weights.tolist())
+    if edge_ids is None:
+        return None
+    if congestion is None:
+        congestion, edge_times = EDGE_STATE
+    else:
+        edge_times = EDGE_BASE_TIME * congestion
+    return RouteResult.from_edges(
+        source_id, edge_ids, EDGE_TARGET, edge_times, congestion, strategy
+    )
+
+
+def _with_road_congestion(congestion: np.ndarray, factors: Dict[str, float]) -> np.ndarray:
+    """Copy of per-edge congestion with "U-V" road factors applied both ways."""
+    congestion = congestion.copy()
+    for road, factor in factors.items():
+        u, v = road.split("-")
+        for edge in ((u, v), (v, u)):
+            edge_id = EDGE_INDEX.get(edge)
+            if edge_id is not None:
+                congestion[edge_id] = factor
+    return congestion
+
+
+def set_road_congestion(factors: Dict[str, float]) -> int:
+    """
+    Update congestion factors for roads given as "U-V" keys.
+
+    Both directions of each road are updated, the congestion and time
+    arrays are built first and published together as a new EDGE_STATE
+    (readers never see a half-written or mismatched pair) and the
+    congestion version is bumped once for the whole batch.
+    """
+    load_graph()
+    with _state_lock:
+        _install_congestion_locked(_with_road_congestion(EDGE_STATE.congestion, factors))
+        version = _bump_locked()
+    _notify_listeners(version)
+    return version
+
+
+def _install_congestion_locked(congestion: np.ndarray) -> None:
+    """Publish new per-edge congestion (and G attrs); caller holds _state_lock."""
+    global EDGE_STATE
+    state = EdgeState(congestion, EDGE_BASE_TIME * congestion)
+    for (u, v), edge_id in EDGE_INDEX.items():
+        G.edges[u, v]["congestion_factor"] = float(congestion[edge_id])
+    EDGE_STATE = state
+
+
+def _bump_locked() -> int:
+    """Increment the version; caller holds _state_lock."""
+    global congestion_version
+    congestion_version += 1
+    return congestion_version
+
+
+def _notify_listeners(version: int) -> None:
+    # Outside _state_lock, so listeners may read the routing state
+    for listener in list(_version_listeners):
+        listener(version)
+
+
+def bump_congestion_version() -> int:
+    """Mark edge weights as changed; returns the new version."""
+    with _state_lock:
+        version = _bump_locked()
+    _notify_listeners(version)
+    return version
+
+
+def _routing_state() -> Tuple[int, EdgeState, bool]:
+    """Consistent (congestion version, edge state, emergency flag) snapshot."""
+    with _state_lock:
+        return congestion_version, EDGE_STATE, emergency_mode
+
+
+def get_routing_snapshot() -> Dict[str, object]:
+    """Version, per-edge congestion and emergency flag as plain data (for the traffic log)."""
+    load_graph()
+    version, state, emergency = _routing_state()
+    return {"version": version, "congestion": state.congestion.tolist(), "emergency_mode": emergency}
+
+
+def restore_routing_snapshot(congestion: List[float], emergency: bool) -> int:
+    """Install recorded per-edge congestion and emergency flag as a new version."""
+    global emergency_mode
+    load_graph()
+    values = np.array(congestion, dtype=np.float64)
+    if values.shape != EDGE_BASE_TIME.shape:
+        raise ValueError("Snapshot does not match the graph's edges")
+    with _state_lock:
+        _install_congestion_locked(values)
+        emergency_mode = bool(emergency)
+        version = _bump_locked()
+    _notify_listeners(version)
+    return version
+
+
+def add_version_listener(listener: Callable[[int], None]) -> None:
+    """Register a callback run with the new version after every bump."""
+    if listener not in _version_listeners:
+        _version_listeners.append(listener)
+
+
+def get_congestion_version() -> int:
+    """Get the version of the current edge weights."""
+    return congestion_version
 
 
 def set_emergency_mode(enabled: bool) -> None:
     """Enable or disable emergency mode."""
     global emergency_mode
-    emergency_mode = enabled
+    with _state_lock:
+        if emergency_mode == enabled:
+            return
+        emergency_mode = enabled
+        version = _bump_locked()
+    _notify_listeners(version)
 
 
 def get_emergency_mode() -> bool:
@@ -94,6 +373,58 @@ def _get_confidence_level(congestion_score: float) -> str:
         return "Low"
 
 
+def serialize_route(result: RouteResult) -> Dict[str, Union[List[str], float, str]]:
+    """Turn a RouteResult into the API response shape (labels built here)."""
+    path = result.labels(NODES)
+    data: Dict[str, Union[List[str], float, str]] = {
+        "route": path,
+        "total_time": round(result.total_time, 2),
+        "congestion_score": round(result.congestion_score, 2),
+        "explanation": _generate_route_explanation(path, result.congestion_score),
+        "confidence": _get_confidence_level(result.congestion_score),
+    }
+    if result.strategy is not None:
+        data["strategy"] = result.strategy
+    return data
+
+
+def _optimal_key(source: str, destination: str, version: Hashable, load_version: Optional[int] = None) -> Tuple:
+    return ("optimal", source, destination, version, load_version)
+
+
+def _multiple_key(source: str, destination: str, version: Hashable, max_routes: int = 3) -> Tuple:
+    return ("multiple", source, destination, max_routes, version)
+
+
+def _compute_multiple_routes(
+    source: str,
+    destination: str,
+    congestion: Optional[np.ndarray] = None,
+    emergency: Optional[bool] = None,
+) -> List[RouteResult]:
+    """Run the fastest / least congestion / fewest hops searches."""
+    routes: List[RouteResult] = []
+    live = EDGE_STATE.congestion if congestion is None else congestion
+
+    # Strategy 1: Fastest route (original Dijkstra)
+    weights = _edge_weights(congestion=live, emergency=emergency)
+    fastest = _search(source, destination, weights, "Fastest Route", live)
+    if fastest is not None:
+        routes.append(fastest)
+
+    # Strategy 2: Least congestion (minimize congestion factor)
+    least_congested = _search(source, destination, live * 100, "Least Congestion", live)
+    if least_congested is not None and not any(least_congested.same_path(r) for r in routes):
+        routes.append(least_congested)
+
+    # Strategy 3: Shortest distance (fewest nodes)
+    fewest_hops = _search(source, destination, np.ones(len(EDGES)), "Shortest Distance", live)
+    if fewest_hops is not None and not any(fewest_hops.same_path(r) for r in routes):
+        routes.append(fewest_hops)
+
+    return routes
+
+
 def get_multiple_routes(source: str, destination: str, max_routes: int = 3) -> List[Dict[str, Union[List[str], float, str]]]:
     """
     Generate multiple route options between two nodes.
@@ -102,117 +433,267 @@ def get_multiple_routes(source: str, destination: str, max_routes: int = 3) -> L
     - Returns up to max_routes different route options
     - Each route has different trade-offs (time vs congestion)
     """
+    load_graph()
     if source not in G or destination not in G:
         return [{"error": "Route not found"}]
-    
-    routes = []
-    
-    # Strategy 1: Fastest route (original Dijkstra)
-    try:
-        path1 = nx.dijkstra_path(G, source, destination, weight=_edge_weight)
-        route1_data = _calculate_route_metrics(path1, "Fastest Route")
-        routes.append(route1_data)
-    except (nx.NetworkXNoPath, nx.NodeNotFound):
-        pass
-    
-    # Strategy 2: Least congestion (minimize congestion factor)
-    def congestion_weight(u: str, v: str, data: Dict) -> float:
-        return data.get("congestion_factor", 1.0) * 100  # Heavy penalty for congestion
-    
-    try:
-        path2 = nx.dijkstra_path(G, source, destination, weight=congestion_weight)
-        route2_data = _calculate_route_metrics(path2, "Least Congestion")
-        # Only add if different from first route
-        if len(routes) == 0 or path2 != routes[0]["route"]:
-            routes.append(route2_data)
-    except (nx.NetworkXNoPath, nx.NodeNotFound):
-        pass
-    
-    # Strategy 3: Shortest distance (fewest nodes)
-    try:
-        path3 = nx.shortest_path(G, source, destination)
-        route3_data = _calculate_route_metrics(path3, "Shortest Distance")
-        # Only add if different from existing routes
-        if len(routes) == 0 or (path3 != routes[0]["route"] and (len(routes) == 1 or path3 != routes[1]["route"])):
-            routes.append(route3_data)
-    except (nx.NetworkXNoPath, nx.NodeNotFound):
-        pass
-    
-    # If no routes found, return error
-    if not routes:
-        return [{"error": "No routes found"}]
-    
-    return routes[:max_routes]
 
+    cache_key = _multiple_key(source, destination, congestion_version, max_routes)
+    routes = ROUTE_CACHE.get(cache_key)
+    if routes is None:
+        routes = tuple(_compute_multiple_routes(source, destination)[:max_routes])
+        # If no routes found, return error
+        if not routes:
+            return [{"error": "No routes found"}]
+        ROUTE_CACHE.put(cache_key, routes)
+
+    return [serialize_route(route) for route in routes]
+
+
+def _pareto_edge_costs(congestion: np.ndarray) -> np.ndarray:
+    """Per-edge (time, congestion exposure, CO2 kg) cost matrix."""
+    if emergency_mode:
+        congestion = np.where(EDGE_CRITICAL, congestion * 1.5, congestion)
+    travel_time = EDGE_BASE_TIME * congestion
+    # Minutes lost to congestion on top of free-flow time
+    exposure = EDGE_BASE_TIME * (congestion - 1.0)
+    distance_km = EDGE_BASE_TIME / 60.0 * FREE_FLOW_SPEED_KMH
+    co2 = distance_km * CO2_KG_PER_KM * (1.0 + CO2_CONGESTION_FACTOR * (congestion - 1.0))
+    return np.column_stack([travel_time, np.maximum(exposure, 0.0), co2])
+
+
+def get_pareto_routes(
+    source: str, destination: str, max_routes: int = 4, epsilon: float = DEFAULT_EPSILON
+) -> Dict[str, object]:
+    """
+    Return a small, diverse Pareto front of routes between two nodes.
+
+    - Criteria: travel time, congestion exposure (minutes lost to
+      congestion) and estimated CO2 in kg
+    - Uses an epsilon-relaxed label-setting search with label/runtime caps
+    - Each route carries its three criteria next to the usual metrics;
+      total_time is the unpenalized time as in /route, while travel_time
+      includes the emergency critical-zone penalty the search optimizes
+    """
+    load_graph()
+    if source not in G or destination not in G:
+        return {"error": "Route not found"}
+
+    cache_key = ("pareto", source, destination, max_routes, epsilon, congestion_version)
+    cached = ROUTE_CACHE.get(cache_key)
+    if cached is None:
+        source_id = NODE_INDEX[source]
+        state = EDGE_STATE
+        live = state.congestion
+        edge_costs = _pareto_edge_costs(live)
+        search = pareto_search(
+            _OUT_EDGES, _EDGE_TARGET_LIST, edge_costs,
+            source_id, NODE_INDEX[destination], epsilon=epsilon,
+        )
+        paths = search.paths
+        if not paths and search.truncated:
+            # Budget ran out before reaching the target: fall back to the fastest route
+            fastest = _search(source, destination, edge_costs[:, 0], congestion=live)
+            if fastest is not None:
+                totals = edge_costs[fastest.edge_ids].sum(axis=0)
+                paths = [ParetoPath(fastest.edge_ids, tuple(float(c) for c in totals))]
+        if not paths:
+            return {"error": "Route not found"}
+        front = tuple(
+            (
+                RouteResult.from_edges(source_id, path.edge_ids, EDGE_TARGET, state.time, live),
+                path.costs,
+            )
+            for path in select_diverse(paths, max_routes)
+        )
+        cached = (front, len(paths), search.labels_created, search.truncated)
+        ROUTE_CACHE.put(cache_key, cached)
+
+    front, front_size, labels_created, truncated = cached
+    best = [min(costs[i] for _, costs in front) for i in range(3)]
+    names = ["Fastest", "Least Congestion Exposure", "Lowest CO2"]
+
+    routes = []
+    for result, costs in front:
+        strategy = " + ".join(name for name, value, low in zip(names, costs, best) if value <= low)
+        data = serialize_route(result.with_strategy(f"Pareto: {strategy or 'Balanced'}"))
+        data["travel_time"] = round(costs[0], 2)
+        data["congestion_exposure"] = round(costs[1], 2)
+        data["co2_kg"] = round(costs[2], 3)
+        routes.append(data)
 
-def _calculate_route_metrics(path: List[str], strategy_name: str) -> Dict[str, Union[List[str], float, str]]:
-    """Calculate metrics for a given path."""
-    total_time = 0.0
-    congestion_values: List[float] = []
-    
-    for u, v in zip(path[:-1], path[1:]):
-        data = G[u][v]
-        base_time = data.get("base_time", 0)
-        congestion_factor = data.get("congestion_factor", 1.0)
-        
-        total_time += base_time * congestion_factor
-        congestion_values.append(congestion_factor)
-    
-    average_congestion = sum(congestion_values) / len(congestion_values) if congestion_values else 0.0
-    
     return {
-        "route": path,
-        "total_time": round(total_time, 2),
-        "congestion_score": round(average_congestion, 2),
-        "explanation": _generate_route_explanation(path, average_congestion),
-        "confidence": _get_confidence_level(average_congestion),
-        "strategy": strategy_name
+        "routes": routes,
+        "total_options": len(routes),
+        "pareto_front_size": front_size,
+        "labels_created": labels_created,
+        "truncated": truncated,
     }
 
 
-def get_optimal_route(source: str, destination: str) -> Dict[str, Union[List[str], float, str]]:
+def compute_route(
+    source: str, destination: str, load_aware: bool = False
+) -> Optional[RouteResult]:
     """
-    Compute the optimal route between two nodes using Dijkstra.
+    Compact form of get_optimal_route: returns a RouteResult or None.
 
-    - Weight of each edge is base_time * congestion_factor.
-    - Returns route (list of node labels), total_time, and average congestion.
-    - If no path exists, returns an error dict.
+    Uses the route cache and, with load_aware=True, records the chosen
+    route's flow in LOAD_TRACKER (load-aware results use their own cache).
     """
-    # Basic validation: nodes must exist in the graph
+    load_graph()
     if source not in G or destination not in G:
-        return {"error": "Route not found"}
+        return None
+
+    snapshot = LOAD_TRACKER.snapshot() if load_aware else None
+    load_version = snapshot.version if snapshot is not None else None
+    cache_key = _optimal_key(source, destination, congestion_version, load_version)
+    cache = LOAD_AWARE_CACHE if load_aware else ROUTE_CACHE
+
+    result = cache.get(cache_key)
+    if result is None:
+        result = _search(source, destination, _edge_weights(snapshot))
+        if result is None:
+            return None
+        cache.put(cache_key, result)
+
+    if load_aware:
+        LOAD_TRACKER.assign(result.edge_ids)
+
+    return result
+
+
+def _forecast_version(tag: Optional[str], version: int) -> Tuple:
+    """Cache version for forecast routes; tied to the live version they were built on."""
+    return ("forecast", tag, version)
+
+
+def _cache_routes(
+    source: str, destination: str, version: Hashable, congestion: np.ndarray, emergency: bool
+) -> Optional[Tuple[RouteResult, Tuple[RouteResult, ...]]]:
+    """Compute the optimal route and alternatives and cache both under version."""
+    weights = _edge_weights(congestion=congestion, emergency=emergency)
+    optimal = _search(source, destination, weights, congestion=congestion)
+    if optimal is None:
+        return None
+    alternatives = tuple(_compute_multiple_routes(source, destination, congestion, emergency)[:3])
+    ROUTE_CACHE.put(_optimal_key(source, destination, version), optimal)
+    ROUTE_CACHE.put(_multiple_key(source, destination, version), alternatives)
+    return optimal, alternatives
+
+
+def warm_routes(
+    source: str,
+    destination: str,
+    factors: Optional[Dict[str, float]] = None,
+    tag: Optional[str] = None,
+) -> bool:
+    """
+    Compute and cache the optimal route and alternatives for one OD pair.
+
+    - Without factors, fills exactly the entries live requests hit at the
+      current congestion version
+    - With factors ("U-V" -> congestion factor overrides on top of the live
+      values) the routes are computed for that forecast and cached under
+      the forecast version for tag, where get_forecast_routes finds them
+    - Returns False if the pair has no route
+    """
+    load_graph()
+    if source not in G or destination not in G:
+        return False
+
+    # Version, congestion and emergency flag from one consistent snapshot,
+    # so routes are never stored under a version they weren't computed for
+    live_version, state, emergency = _routing_state()
+    congestion = state.congestion
+    if factors is None:
+        version: Hashable = live_version
+    else:
+        version = _forecast_version(tag, live_version)
+        congestion = _with_road_congestion(congestion, factors)
+    return _cache_routes(source, destination, version, congestion, emergency) is not None
 
-    try:
-        # Shortest path based on our custom weight
-        path = nx.dijkstra_path(G, source, destination, weight=_edge_weight)
-    except (nx.NetworkXNoPath, nx.NodeNotFound):
-        # If no path can be found, return an error
-        return {"error": "Route not found"}
 
-    # Compute total weighted time and average congestion along the path
-    total_time = 0.0
-    congestion_values: List[float] = []
+def is_route_warm(source: str, destination: str, tag: Optional[str] = None) -> bool:
+    """True if warm_routes() results for this pair are cached right now."""
+    version = congestion_version if tag is None else _forecast_version(tag, congestion_version)
+    return ROUTE_CACHE.contains(_optimal_key(source, destination, version)) and ROUTE_CACHE.contains(
+        _multiple_key(source, destination, version)
+    )
 
-    # Iterate over consecutive node pairs in the path
-    for u, v in zip(path[:-1], path[1:]):
-        data = G[u][v]
-        base_time = data.get("base_time", 0)
-        congestion_factor = data.get("congestion_factor", 1.0)
 
-        total_time += base_time * congestion_factor
-        congestion_values.append(congestion_factor)
+def get_forecast_routes(
+    source: str, destination: str, tag: str, factors: Dict[str, float]
+) -> Dict[str, object]:
+    """
+    Optimal route and alternatives under a congestion forecast.
 
-    # Avoid division by zero; for a valid path there should always be edges
-    average_congestion = sum(congestion_values) / len(congestion_values) if congestion_values else 0.0
+    Served from the entries warm_routes() precomputed for tag when present;
+    otherwise computed with factors (overrides on the live congestion) and
+    cached the same way.
+    """
+    load_graph()
+    if source not in G or destination not in G:
+        return {"error": "Route not found"}
+
+    live_version, state, emergency = _routing_state()
+    version = _forecast_version(tag, live_version)
+    optimal = ROUTE_CACHE.get(_optimal_key(source, destination, version))
+    alternatives = ROUTE_CACHE.get(_multiple_key(source, destination, version))
+    cached = optimal is not None and alternatives is not None
+    if not cached:
+        computed = _cache_routes(
+            source, destination, version, _with_road_congestion(state.congestion, factors), emergency
+        )
+        if computed is None:
+            return {"error": "Route not found"}
+        optimal, alternatives = computed
 
     return {
-        "route": path,
-        "total_time": round(total_time, 2),
-        "congestion_score": round(average_congestion, 2),
-        "explanation": _generate_route_explanation(path, average_congestion),
-        "confidence": _get_confidence_level(average_congestion),
+        "route": serialize_route(optimal),
+        "alternatives": [serialize_route(route) for route in alternatives],
+        "cached": cached,
     }
 
 
-__all__ = ["get_optimal_route", "get_multiple_routes", "G", "set_emergency_mode", "get_emergency_mode"]
+def get_optimal_route(
+    source: str, destination: str, load_aware: bool = False
+) -> Dict[str, Union[List[str], float, str]]:
+    """
+    Compute the optimal route between two nodes using Dijkstra.
 
+    - Weight of each edge is base_time * congestion_factor.
+    - With load_aware=True, each edge weight is also multiplied by the
+      marginal cost of the flow recently assigned to it, and the chosen
+      route's flow is recorded for the next requests.
+    - Returns route (list of node labels), total_time, and average congestion.
+    - If no path exists, returns an error dict.
+    """
+    result = compute_route(source, destination, load_aware)
+    if result is None:
+        # Unknown nodes or no path at all
+        return {"error": "Route not found"}
+    return serialize_route(result)
+
+
+__all__ = [
+    "get_optimal_route",
+    "get_multiple_routes",
+    "get_pareto_routes",
+    "compute_route",
+    "serialize_route",
+    "G",
+    "NODE_INDEX",
+    "EDGE_INDEX",
+    "load_graph",
+    "LOAD_TRACKER",
+    "set_emergency_mode",
+    "get_emergency_mode",
+    "get_congestion_version",
+    "bump_congestion_version",
+    "set_road_congestion",
+    "get_routing_snapshot",
+    "restore_routing_snapshot",
+    "add_version_listener",
+    "warm_routes",
+    "is_route_warm",
+    "get_forecast_routes",
+]
@@ -0,0 +1,487 @@
+"""
+Streaming congestion ingestion for Fluxora prototype.
+
+- Reads GPS probe pings and loop-detector counts from local files or a
+  local TCP socket (newline separated CSV)
+- An asyncio consumer parses batches, map-matches pings to roads with a
+  uniform grid spatial index and aggregates speeds per road per window
+- Each closed window is published to congestion_model (and its history
+  store) and to the graph engine as one congestion version bump
+- Producers never wait: when the batch queue is full, batches are
+  subsampled ("degrade") or dropped ("drop"), so routing never stalls
+
+Feed formats (one record per line):
+- probe: ts,lat,lon,speed_kmh
+- loop:  ts,road,vehicle_count,speed_kmh   (road like "A-B")
+
+The API feeds its own routing graph only through FLUXORA_INGEST_SOCKET
+(see main.py). The command line tool runs in a separate process, so it
+never changes a running API's routes; use it from the Backend folder to
+benchmark the pipeline or, with the API stopped, to backfill the
+congestion history store from a file:
+    python ingestion.py --bench 500000
+    python ingestion.py --probe-file pings.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import congestion_model
+import graph_engine
+
+
+# Aggregation window for published congestion (seconds of event time)
+WINDOW_SECONDS = 60.0
+
+# Lines per batch handed to the consumer
+BATCH_SIZE = 8192
+
+# Maximum batches waiting in the queue before overload handling kicks in
+QUEUE_BATCHES = 32
+
+# Pings farther than this from every road are discarded
+MAX_MATCH_DISTANCE_M = 150.0
+
+# Grid cell size for the spatial index
+GRID_CELL_M = 500.0
+
+# Roads need at least this many observations in a window to be published
+MIN_OBSERVATIONS = 3
+
+# Published congestion factor range
+MIN_FACTOR = 1.0
+MAX_FACTOR = 3.0
+
+# Feed kinds accepted from files and sockets
+FEED_KINDS = ("probe", "loop")
+
+_EARTH_RADIUS_M = 6371000.0
+
+
+class RoadGrid:
+    """
+    Uniform grid spatial index over straight road segments.
+
+    Coordinates are projected to local metres (equirectangular). Every
+    grid cell stores up to K candidate roads (padded with -1), so matching
+    a batch is a single vectorized gather plus point-segment distances.
+    """
+
+    def __init__(
+        self,
+        segments: Dict[str, Tuple[Tuple[float, float], Tuple[float, float]]],
+        cell_m: float = GRID_CELL_M,
+        max_distance_m: float = MAX_MATCH_DISTANCE_M,
+    ) -> None:
+        self.roads = list(segments)
+        coords = np.array([[a[0], a[1], b[0], b[1]] for a, b in segments.values()], dtype=np.float64)
+        self.lat0 = float(coords[:, [0, 2]].mean())
+        self.lon0 = float(coords[:, [1, 3]].mean())
+        self._lon_scale = math.cos(math.radians(self.lat0))
+        self.max_distance_m = max_distance_m
+        self.cell_m = cell_m
+
+        ax, ay = self.project(coords[:, 0], coords[:, 1])
+        bx, by = self.project(coords[:, 2], coords[:, 3])
+        self.ax, self.ay, self.bx, self.by = ax, ay, bx, by
+
+        pad = max_distance_m
+        self.x_min = float(min(ax.min(), bx.min()) - pad)
+        self.y_min = float(min(ay.min(), by.min()) - pad)
+        self.nx = int((max(ax.max(), bx.max()) + pad - self.x_min) // cell_m) + 1
+        self.ny = int((max(ay.max(), by.max()) + pad - self.y_min) // cell_m) + 1
+
+        # Candidate roads per cell: segment bbox (grown by pad) overlaps the cell
+        cells: List[List[int]] = [[] for _ in range(self.nx * self.ny)]
+        for road in range(len(self.roads)):
+            x0 = int((min(ax[road], bx[road]) - pad - self.x_min) // cell_m)
+            x1 = int((max(ax[road], bx[road]) + pad - self.x_min) // cell_m)
+            y0 = int((min(ay[road], by[road]) - pad - self.y_min) // cell_m)
+            y1 = int((max(ay[road], by[road]) + pad - self.y_min) // cell_m)
+            for cx in range(max(x0, 0), min(x1, self.nx - 1) + 1):
+                for cy in range(max(y0, 0), min(y1, self.ny - 1) + 1):
+                    cells[cy * self.nx + cx].append(road)
+        width = max(1, max(len(c) for c in cells))
+        self.candidates = np.full((len(cells), width), -1, dtype=np.int32)
+        for cell, roads in enumerate(cells):
+            self.candidates[cell, : len(roads)] = roads
+
+    def project(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        x = np.radians(lon - self.lon0) * self._lon_scale * _EARTH_RADIUS_M
+        y = np.radians(lat - self.lat0) * _EARTH_RADIUS_M
+        return x, y
+
+    def segment_lengths_m(self) -> np.ndarray:
+        return np.hypot(self.bx - self.ax, self.by - self.ay)
+
+    def match(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Return the nearest road index per ping, or -1 if none is close enough."""
+        x, y = self.project(lat, lon)
+        cx = ((x - self.x_min) // self.cell_m).astype(np.int64)
+        cy = ((y - self.y_min) // self.cell_m).astype(np.int64)
+        inside = (cx >= 0) & (cx < self.nx) & (cy >= 0) & (cy < self.ny)
+        result = np.full(lat.shape[0], -1, dtype=np.int32)
+        if not inside.any():
+            return result
+
+        x, y = x[inside], y[inside]
+        cand = self.candidates[cy[inside] * self.nx + cx[inside]]  # (n, K)
+        valid = cand >= 0
+        idx = np.where(valid, cand, 0)
+
+        ax, ay = self.ax[idx], self.ay[idx]
+        dx, dy = self.bx[idx] - ax, self.by[idx] - ay
+        seg_len2 = np.maximum(dx * dx + dy * dy, 1e-9)
+        t = np.clip(((x[:, None] - ax) * dx + (y[:, None] - ay) * dy) / seg_len2, 0.0, 1.0)
+        dist2 = (x[:, None] - (ax + t * dx)) ** 2 + (y[:, None] - (ay + t * dy)) ** 2
+        dist2 = np.where(valid, dist2, np.inf)
+
+        best = np.argmin(dist2, axis=1)
+        rows = np.arange(best.shape[0])
+        matched = np.where(dist2[rows, best] <= self.max_distance_m ** 2, cand[rows, best], -1)
+        result[inside] = matched
+        return result
+
+
+def _parse_csv(lines: Sequence[bytes], columns: int) -> np.ndarray:
+    """Parse numeric CSV lines into an (n, columns) array, skipping bad lines."""
+    # Vectorized path only when every line has the right field count, so
+    # short and long lines can't offset each other and shift columns
+    if all(line.count(b",") == columns - 1 for line in lines):
+        try:
+            return np.array(b",".join(lines).split(b","), dtype=np.float64).reshape(-1, columns)
+        except ValueError:
+            pass
+    rows = []
+    for line in lines:
+        parts = line.split(b",")
+        if len(parts) != columns:
+            continue
+        try:
+            rows.append([float(p) for p in parts])
+        except ValueError:
+            continue
+    return np.array(rows, dtype=np.float64).reshape(-1, columns)
+
+
+def _parse_loop(lines: Sequence[bytes], road_index: Dict[str, int]) -> np.ndarray:
+    """Parse loop-detector lines into (n, 4) rows of ts, road id, count, speed, skipping bad lines."""
+    rows = []
+    for line in lines:
+        parts = line.split(b",")
+        if len(parts) != 4:
+            continue
+        road = road_index.get(parts[1].strip().decode(errors="ignore"))
+        if road is None:
+            continue
+        try:
+            rows.append([float(parts[0]), road, float(parts[2]), float(parts[3])])
+        except ValueError:
+            continue
+    return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
+
+class IngestionPipeline:
+    """Bounded batch queue plus the consumer that aggregates and publishes."""
+
+    def __init__(
+        self,
+        window_seconds: float = WINDOW_SECONDS,
+        queue_batches: int = QUEUE_BATCHES,
+        overload: str = "degrade",
+        publish_to_graph: bool = True,
+    ) -> None:
+        if overload not in ("degrade", "drop"):
+            raise ValueError("overload must be 'degrade' or 'drop'")
+        self.window_seconds = window_seconds
+        self.overload = overload
+        self.publish_to_graph = publish_to_graph
+        self.queue: "asyncio.Queue[Optional[Tuple[str, List[bytes]]]]" = asyncio.Queue(maxsize=queue_batches)
+
+        segments = {}
+        for road in congestion_model.ROAD_CONGESTION:
+            u, v = road.split("-")
+            segments[road] = (congestion_model.LOCATION_COORDS[u], congestion_model.LOCATION_COORDS[v])
+        self.grid = RoadGrid(segments)
+        self.roads = self.grid.roads
+        self.road_index = {road: i for i, road in enumerate(self.roads)}
+
+        # Free-flow speed per road from its length and base travel time
+        base_time = {(u, v): data["base_time"] for u, v, data in graph_engine.EDGES}
+        base_minutes = np.array([base_time[tuple(road.split("-"))] for road in self.roads], dtype=np.float64)
+        self.free_flow_kmh = self.grid.segment_lengths_m() / 1000.0 / (base_minutes / 60.0)
+
+        self._window: Optional[int] = None
+        self._speed_sum = np.zeros(len(self.roads))
+        self._observations = np.zeros(len(self.roads))
+        self.stats: Dict[str, int] = {
+            "lines_received": 0,
+            "lines_processed": 0,
+            "lines_sampled_out": 0,
+            "lines_dropped": 0,
+            "pings_unmatched": 0,
+            "windows_published": 0,
+            "batches_failed": 0,
+        }
+        self.last_error: Optional[str] = None
+
+    # ---- producer side -------------------------------------------------
+
+    def submit(self, kind: str, lines: List[bytes]) -> bool:
+        """
+        Offer a batch without ever waiting.
+
+        Above half capacity, "degrade" keeps every other line; a full
+        queue drops the batch. Returns False if the batch was dropped.
+        """
+        self.stats["lines_received"] += len(lines)
+        if self.overload == "degrade" and self.queue.qsize() >= self.queue.maxsize // 2:
+            kept = lines[::2]
+            self.stats["lines_sampled_out"] += len(lines) - len(kept)
+            lines = kept
+        try:
+            self.queue.put_nowait((kind, lines))
+            return True
+        except asyncio.QueueFull:
+            self.stats["lines_dropped"] += len(lines)
+            return False
+
+    # ---- consumer side -------------------------------------------------
+
+    def process_batch(self, kind: str, lines: List[bytes]) -> None:
+        """Parse, map-match and aggregate one batch (CPU bound)."""
+        if kind == "probe":
+            data = _parse_csv(lines, 4)
+            if not data.size:
+                return
+            ts, speed = data[:, 0], data[:, 3]
+            roads = self.grid.match(data[:, 1], data[:, 2])
+            weights = np.ones_like(speed)
+            self.stats["pings_unmatched"] += int(np.count_nonzero(roads < 0))
+        elif kind == "loop":
+            data = _parse_loop(lines, self.road_index)
+            if not data.size:
+                return
+            ts, roads, weights, speed = data[:, 0], data[:, 1].astype(np.int32), data[:, 2], data[:, 3]
+        else:
+            raise ValueError(f"Unknown feed kind {kind}")
+
+        self.stats["lines_processed"] += len(lines)
+        keep = (roads >= 0) & np.isfinite(ts) & np.isfinite(speed) & (speed > 0) & (weights > 0)
+        ts, roads, speed, weights = ts[keep], roads[keep], speed[keep], weights[keep]
+        if not ts.size:
+            return
+
+        windows = np.floor(ts / self.window_seconds).astype(np.int64)
+        newest = int(windows.max())
+        if self._window is None:
+            self._window = newest
+        if newest > self._window:
+            # Late/current observations close out the current window first
+            current = windows <= self._window
+            self._accumulate(roads[current], speed[current], weights[current])
+            self.publish()
+            self._window = newest
+            roads, speed, weights = roads[~current], speed[~current], weights[~current]
+        self._accumulate(roads, speed, weights)
+
+    def _accumulate(self, roads: np.ndarray, speed: np.ndarray, weights: np.ndarray) -> None:
+        n = len(self.roads)
+        self._speed_sum += np.bincount(roads, weights=speed * weights, minlength=n)
+        self._observations += np.bincount(roads, weights=weights, minlength=n)
+
+    def publish(self) -> Dict[str, float]:
+        """Turn the current window into congestion factors and publish them."""
+        seen = self._observations >= MIN_OBSERVATIONS
+        factors: Dict[str, float] = {}
+        if seen.any():
+            mean_speed = self._speed_sum[seen] / self._observations[seen]
+            values = np.clip(self.free_flow_kmh[seen] / mean_speed, MIN_FACTOR, MAX_FACTOR)
+            factors = {
+                self.roads[i]: round(float(v), 2) for i, v in zip(np.flatnonzero(seen), values)
+            }
+        self._speed_sum[:] = 0.0
+        self._observations[:] = 0.0
+        if not factors:
+            return factors
+
+        congestion_model.ROAD_CONGESTION.update(factors)
+        window_ts = (self._window or 0) * self.window_seconds
+        congestion_model.record_congestion_snapshot(window_ts)
+        if self.publish_to_graph:
+            graph_engine.set_road_congestion(factors)
+        self.stats["windows_published"] += 1
+        return factors
+
+    async def run(self) -> None:
+        """
+        Consume batches until a None sentinel arrives, then flush.
+
+        A batch that fails is counted and skipped; the consumer keeps
+        draining the queue so producers and stop() never get stuck.
+        """
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                break
+            kind, lines = item
+            try:
+                # Heavy numpy work runs off the event loop
+                await asyncio.to_thread(self.process_batch, kind, lines)
+            except Exception as exc:
+                self.stats["batches_failed"] += 1
+                self.last_error = repr(exc)
+        self.publish()
+
+    async def stop(self) -> None:
+        """Ask the consumer to finish; waits for space for the sentinel."""
+        await self.queue.put(None)
+
+
+def _split_lines(buffer: bytes) -> Tuple[List[bytes], bytes]:
+    """Split complete lines off a buffer, returning (lines, remainder)."""
+    *lines, rest = buffer.split(b"\n")
+    return [line.strip() for line in lines if line.strip()], rest
+
+
+async def file_source(pipeline: IngestionPipeline, path: str, kind: str, batch_size: int = BATCH_SIZE) -> None:
+    """Feed a local CSV file to the pipeline as fast as it is accepted."""
+    pending: List[bytes] = []
+    rest = b""
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(1 << 20)
+            if not chunk:
+                break
+            lines, rest = _split_lines(rest + chunk)
+            pending.extend(lines)
+            while len(pending) >= batch_size:
+                pipeline.submit(kind, pending[:batch_size])
+                pending = pending[batch_size:]
+                await asyncio.sleep(0)  # let the consumer run
+    if rest.strip():
+        pending.append(rest.strip())
+    if pending:
+        pipeline.submit(kind, pending)
+
+
+async def start_socket_source(
+    pipeline: IngestionPipeline, host: str, port: int, batch_size: int = BATCH_SIZE
+) -> asyncio.AbstractServer:
+    """
+    Accept local TCP feeds. The first line of a connection names the
+    feed kind ("probe" or "loop"); the rest are CSV records.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        kind = (await reader.readline()).strip().decode(errors="ignore") or "probe"
+        if kind not in FEED_KINDS:
+            # Missing or bad header line: refuse the connection before submitting anything
+            writer.write(b"error: first line must be one of " + ",".join(FEED_KINDS).encode() + b"\n")
+            writer.close()
+            return
+        pending: List[bytes] = []
+        rest = b""
+        last_submit = time.monotonic()
+        try:
+            while True:
+                chunk = await reader.read(1 << 16)
+                if not chunk:
+                    break
+                lines, rest = _split_lines(rest + chunk)
+                pending.extend(lines)
+                if len(pending) >= batch_size or time.monotonic() - last_submit > 0.5:
+                    pipeline.submit(kind, pending)
+                    pending = []
+                    last_submit = time.monotonic()
+            if rest.strip():
+                pending.append(rest.strip())
+            if pending:
+                pipeline.submit(kind, pending)
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def synthetic_pings(count: int, start_ts: float, seconds: float, seed: int = 0) -> List[bytes]:
+    """Generate probe lines scattered along the roads (for benchmarks/tests)."""
+    rng = np.random.default_rng(seed)
+    roads = list(congestion_model.ROAD_CONGESTION)
+    pick = rng.integers(0, len(roads), count)
+    t = rng.random(count)
+    ends = np.array([
+        congestion_model.LOCATION_COORDS[u] + congestion_model.LOCATION_COORDS[v]
+        for u, v in (road.split("-") for road in roads)
+    ])[pick]
+    lat = ends[:, 0] + t * (ends[:, 2] - ends[:, 0]) + rng.normal(0, 0.0003, count)
+    lon = ends[:, 1] + t * (ends[:, 3] - ends[:, 1]) + rng.normal(0, 0.0003, count)
+    ts = np.sort(start_ts + rng.random(count) * seconds)
+    speed = rng.uniform(5, 40, count)
+    return [
+        f"{a:.3f},{b:.6f},{c:.6f},{d:.1f}".encode()
+        for a, b, c, d in zip(ts.tolist(), lat.tolist(), lon.tolist(), speed.tolist())
+    ]
+
+
+async def _benchmark(count: int) -> None:
+    # Queue sized to hold everything so the benchmark measures full processing
+    pipeline = IngestionPipeline(queue_batches=count // BATCH_SIZE + 2, overload="drop")
+    lines = synthetic_pings(count, time.time() - 300, 300)
+    consumer = asyncio.create_task(pipeline.run())
+    started = time.perf_counter()
+    for i in range(0, count, BATCH_SIZE):
+        pipeline.submit("probe", lines[i : i + BATCH_SIZE])
+    await pipeline.stop()
+    await consumer
+    elapsed = time.perf_counter() - started
+    print(f"{count} pings in {elapsed:.3f}s -> {count / elapsed:,.0f} pings/sec")
+    print(pipeline.stats)
+    print(congestion_model.ROAD_CONGESTION)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    pipeline = IngestionPipeline(window_seconds=args.window, overload=args.overload)
+    consumer = asyncio.create_task(pipeline.run())
+    if args.probe_file:
+        await file_source(pipeline, args.probe_file, "probe")
+    if args.loop_file:
+        await file_source(pipeline, args.loop_file, "loop")
+    if args.socket:
+        host, port = args.socket.rsplit(":", 1)
+        server = await start_socket_source(pipeline, host, int(port))
+        async with server:
+            await server.serve_forever()
+    await pipeline.stop()
+    await consumer
+    print(pipeline.stats)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Ingest probe/loop-detector feeds into Fluxora.")
+    parser.add_argument("--probe-file")
+    parser.add_argument("--loop-file")
+    parser.add_argument("--socket", help="host:port to listen on")
+    parser.add_argument("--window", type=float, default=WINDOW_SECONDS)
+    parser.add_argument("--overload", choices=["degrade", "drop"], default="degrade")
+    parser.add_argument("--bench", type=int, metavar="N", help="benchmark N synthetic pings")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        asyncio.run(_benchmark(args.bench))
+    else:
+        asyncio.run(_serve(args))
+
+
+__all__ = ["IngestionPipeline", "RoadGrid", "FEED_KINDS", "file_source", "start_socket_source", "synthetic_pings"]
+
+
+if __name__ == "__main__":
+    main()
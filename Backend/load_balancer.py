@@ -0,0 +1,175 @@
+"""
+Load-aware routing support for Fluxora prototype.
+
+- Tracks recently assigned flow per edge in exponentially decaying counters
+- Turns that flow into a marginal-cost multiplier on edge weights
+- Quantizes each edge's penalty into a few levels so the load version only
+  moves when some penalty really changes, keeping load-aware routes cacheable
+
+Counters are sharded per thread: each request thread writes its own row
+under that row's lock, which is uncontended unless there are more threads
+than shards. Each row keeps its own decay epoch. Reads sum the rows.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import threading
+import time
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+
+# Assigned flow halves every LOAD_HALF_LIFE_SECONDS
+LOAD_HALF_LIFE_SECONDS = 300.0
+
+# Assigned vehicles an edge absorbs before the penalty becomes noticeable
+EDGE_CAPACITY = 20.0
+
+# BPR-style congestion curve: t = t0 * (1 + alpha * (x / c) ** beta)
+PENALTY_ALPHA = 0.15
+PENALTY_BETA = 4.0
+
+# Per-edge multipliers are quantized to powers of PENALTY_STEP (level 0 is
+# free flow, ~15 vehicles per edge) and capped at MAX_PENALTY_LEVEL (~6x,
+# saturated), so each edge has only a handful of possible states
+PENALTY_STEP = 1.25
+MAX_PENALTY_LEVEL = 8
+
+# Snapshot refresh triggers (whichever comes first)
+REFRESH_INTERVAL_SECONDS = 1.0
+REFRESH_FLOW = 2.0
+
+# Number of per-thread counter rows
+NUM_SHARDS = 16
+
+# Rebase a shard's decay epoch before the growth factor gets large
+_MAX_DECAY_EXPONENT = 30.0
+
+
+class LoadSnapshot(NamedTuple):
+    """Quantized load state used to weight one route computation."""
+
+    version: int
+    multipliers: np.ndarray  # per-edge weight multiplier, >= 1.0
+
+
+def penalty_levels(load: np.ndarray) -> np.ndarray:
+    """Quantized penalty level per edge (multiplier ~ PENALTY_STEP ** level)."""
+    multipliers = marginal_cost_multiplier(load)
+    levels = np.floor(np.log(multipliers) / math.log(PENALTY_STEP))
+    return np.minimum(levels, MAX_PENALTY_LEVEL).astype(np.int64)
+
+
+def marginal_cost_multiplier(load: np.ndarray, capacity: float = EDGE_CAPACITY) -> np.ndarray:
+    """
+    Marginal cost of adding one more vehicle, relative to free flow.
+
+    For BPR travel time t(x), the marginal cost is d(x * t(x)) / dx,
+    i.e. t0 * (1 + alpha * (beta + 1) * (x / c) ** beta).
+    """
+    ratio = np.asarray(load, dtype=np.float64) / capacity
+    return 1.0 + PENALTY_ALPHA * (PENALTY_BETA + 1.0) * np.power(ratio, PENALTY_BETA)
+
+
+class EdgeLoadTracker:
+    """
+    Sharded, decaying per-edge flow counters.
+
+    Values are stored scaled by exp(rate * (t - epoch)) so that an update
+    is a single add; decay is applied once when reading. Every shard has
+    its own epoch, rebased together with its row under the shard lock, so
+    an update is never scaled against an epoch that moved under it.
+    """
+
+    def __init__(
+        self,
+        num_edges: int,
+        half_life: float = LOAD_HALF_LIFE_SECONDS,
+        num_shards: int = NUM_SHARDS,
+    ) -> None:
+        self.num_edges = num_edges
+        self._rate = math.log(2.0) / half_life
+        self._counts = np.zeros((num_shards, num_edges), dtype=np.float64)
+        self._epochs = np.full(num_shards, time.monotonic())
+        self._shard_locks = [threading.Lock() for _ in range(num_shards)]
+        self._shard_ids = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()  # snapshot refresh/reset
+
+        self._levels = np.zeros(num_edges, dtype=np.int64)
+        self._snapshot = LoadSnapshot(0, np.ones(num_edges, dtype=np.float64))
+        self._refreshed_at = time.monotonic()
+        self._flow_since_refresh = 0.0
+
+    def _shard(self) -> int:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = next(self._shard_ids) % self._counts.shape[0]
+            self._local.shard = shard
+        return shard
+
+    def assign(self, edge_ids: Sequence[int], flow: float = 1.0) -> None:
+        """Record flow assigned to each edge of a route (hot path)."""
+        now = time.monotonic()
+        idx = np.asarray(edge_ids, dtype=np.intp)
+        shard = self._shard()
+        with self._shard_locks[shard]:
+            exponent = self._rate * (now - self._epochs[shard])
+            if exponent >= _MAX_DECAY_EXPONENT:
+                self._counts[shard] *= math.exp(-exponent)
+                self._epochs[shard] = now
+                exponent = 0.0
+            if idx.size:
+                self._counts[shard, idx] += flow * math.exp(exponent)
+        self._flow_since_refresh += flow
+
+    def current_load(self, now: Optional[float] = None) -> np.ndarray:
+        """Return decayed flow per edge."""
+        now = time.monotonic() if now is None else now
+        load = np.zeros(self.num_edges, dtype=np.float64)
+        for shard, lock in enumerate(self._shard_locks):
+            with lock:
+                load += self._counts[shard] * math.exp(-self._rate * (now - self._epochs[shard]))
+        return load
+
+    def snapshot(self) -> LoadSnapshot:
+        """
+        Return the current quantized load state.
+
+        The snapshot is refreshed at most every REFRESH_INTERVAL_SECONDS or
+        after REFRESH_FLOW vehicles were assigned. The version only changes
+        when some edge moves to a different penalty level.
+        """
+        now = time.monotonic()
+        if (
+            now - self._refreshed_at >= REFRESH_INTERVAL_SECONDS
+            or self._flow_since_refresh >= REFRESH_FLOW
+        ):
+            with self._lock:
+                levels = penalty_levels(self.current_load(now))
+                if not np.array_equal(levels, self._levels):
+                    self._levels = levels
+                    self._snapshot = LoadSnapshot(
+                        self._snapshot.version + 1, np.power(PENALTY_STEP, levels)
+                    )
+                self._refreshed_at = now
+                self._flow_since_refresh = 0.0
+        return self._snapshot
+
+    def reset(self) -> None:
+        """Forget all assigned flow."""
+        with self._lock:
+            for shard, lock in enumerate(self._shard_locks):
+                with lock:
+                    self._counts[shard] = 0.0
+                    self._epochs[shard] = time.monotonic()
+            self._levels = np.zeros(self.num_edges, dtype=np.int64)
+            self._snapshot = LoadSnapshot(
+                self._snapshot.version + 1, np.ones(self.num_edges, dtype=np.float64)
+            )
+
+
+__all__ = ["EdgeLoadTracker", "LoadSnapshot", "marginal_cost_multiplier", "penalty_levels"]
@@ -5,18 +5,60 @@ Runs a simple FastAPI app that exposes:
 - Route calculation
 - Congestion heatmap
 - Lightweight dashboard analytics
+
+Startup is kept cheap for scale-to-zero hosting: heavy modules and the
+graph load in a background preload started by the lifespan handler.
+/health (liveness) answers immediately, /ready reports when preload is done.
 """
 
 from __future__ import annotations
 
+# Imported first so startup timing starts as close to process start as possible
+from startup import get_startup_report, run_preload
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from routes import router as api_router
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Preload in a worker thread so startup completes right away
+    preload_task = asyncio.create_task(asyncio.to_thread(run_preload))
+
+    # Optional local probe/loop-detector feed, e.g. FLUXORA_INGEST_SOCKET=127.0.0.1:9400
+    ingest_server = None
+    ingest_address = os.getenv("FLUXORA_INGEST_SOCKET")
+    if ingest_address:
+        import congestion_model
+        import ingestion
+
+        # Real feed replaces the random per-request congestion updates
+        congestion_model.set_live_feed(True)
+        pipeline = ingestion.IngestionPipeline()
+        consumer = asyncio.create_task(pipeline.run())
+        host, port = ingest_address.rsplit(":", 1)
+        ingest_server = await ingestion.start_socket_source(pipeline, host, int(port))
+
+    yield
+
+    if ingest_server is not None:
+        ingest_server.close()
+        await ingest_server.wait_closed()
+        await pipeline.stop()
+        await consumer
+        congestion_model.set_live_feed(False)
+    await preload_task
+
+
 # Create FastAPI app with a simple title for docs/UI
-app = FastAPI(title="Fluxora API")
+app = FastAPI(title="Fluxora API", lifespan=lifespan)
 
 
 # Allow local frontend apps and production apps to talk to this API
@@ -49,6 +91,16 @@ app.include_router(api_router)
 @app.head("/health")
 def health_check():
     return {"status": "ok"}
+
+
+# Readiness endpoint: 503 until the graph and heavy modules are preloaded
+@app.get("/ready")
+def readiness_check():
+    report = get_startup_report()
+    if not report["ready"]:
+        status = "error" if report["error"] else "starting"
+        return JSONResponse(status_code=503, content={"status": status, **report})
+    return {"status": "ready", **report}
 # Run the server from the backend directory with:
 #   uvicorn main:app --reload
 
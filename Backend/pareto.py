@@ -0,0 +1,205 @@
+"""
+Multi-criteria Pareto route search for Fluxora prototype.
+
+- Label-setting search (multi-objective Dijkstra) over flat edge arrays
+- Each label carries a cost vector, e.g. (time, congestion exposure, CO2)
+- Epsilon-dominance pruning keeps the per-node label bags small
+- Labels live in preallocated numpy arrays, capped by count and runtime
+- select_diverse() picks a small, spread-out subset of the final front
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+
+# Hard cap on labels created per search
+MAX_LABELS = 20000
+
+# Wall-clock budget per search in milliseconds
+MAX_RUNTIME_MS = 50.0
+
+# A label is dropped if another one is within (1 + epsilon) on every criterion
+DEFAULT_EPSILON = 0.05
+
+# Check the runtime budget every N label expansions
+_BUDGET_CHECK_EVERY = 64
+
+
+class ParetoPath(NamedTuple):
+    """One Pareto-optimal path: edge ids plus its cost vector."""
+
+    edge_ids: np.ndarray
+    costs: Tuple[float, ...]
+
+
+class ParetoSearchResult(NamedTuple):
+    paths: List[ParetoPath]
+    labels_created: int
+    truncated: bool  # hit MAX_LABELS or MAX_RUNTIME_MS before finishing
+
+
+def _eps_dominated(bag_costs: np.ndarray, cost: np.ndarray, epsilon: float) -> bool:
+    """True if some row of bag_costs epsilon-dominates cost."""
+    if bag_costs.shape[0] == 0:
+        return False
+    return bool(np.any(np.all(bag_costs <= cost * (1.0 + epsilon), axis=1)))
+
+
+def pareto_search(
+    out_edges: Sequence[Sequence[int]],
+    edge_targets: Sequence[int],
+    edge_costs: np.ndarray,
+    source_id: int,
+    target_id: int,
+    epsilon: float = DEFAULT_EPSILON,
+    max_labels: int = MAX_LABELS,
+    max_runtime_ms: float = MAX_RUNTIME_MS,
+) -> ParetoSearchResult:
+    """
+    Compute an epsilon-Pareto set of paths from source_id to target_id.
+
+    - edge_costs has shape (num_edges, num_criteria), all entries >= 0
+    - labels are popped in order of their first criterion
+    - a new label is discarded if a label at the same node or at the
+      target epsilon-dominates it; labels it dominates are retired
+    """
+    num_criteria = edge_costs.shape[1]
+    costs = np.empty((max_labels, num_criteria), dtype=np.float64)
+    label_node = np.empty(max_labels, dtype=np.int32)
+    label_pred = np.empty(max_labels, dtype=np.int32)
+    label_edge = np.empty(max_labels, dtype=np.int32)
+    label_hops = np.empty(max_labels, dtype=np.int32)
+    alive = np.zeros(max_labels, dtype=bool)
+
+    bags: Dict[int, List[int]] = {}
+    target_labels: List[int] = []
+    edge_cost_rows = [edge_costs[e] for e in range(edge_costs.shape[0])]
+
+    costs[0] = 0.0
+    label_node[0] = source_id
+    label_pred[0] = -1
+    label_edge[0] = -1
+    label_hops[0] = 0
+    alive[0] = True
+    bags[source_id] = [0]
+    count = 1
+    heap = [(0.0, 0)]
+    deadline = time.perf_counter() + max_runtime_ms / 1000.0
+    truncated = False
+    pops = 0
+
+    while heap:
+        pops += 1
+        if pops % _BUDGET_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            truncated = True
+            break
+
+        _, label = heapq.heappop(heap)
+        if not alive[label]:
+            continue
+        node = int(label_node[label])
+        if node == target_id:
+            target_labels.append(label)
+            continue
+        # Target pruning: nothing through this label can beat the front
+        if target_labels and _eps_dominated(costs[target_labels], costs[label], epsilon):
+            continue
+
+        for edge_id in out_edges[node]:
+            nxt = edge_targets[edge_id]
+            new_cost = costs[label] + edge_cost_rows[edge_id]
+
+            if target_labels and _eps_dominated(costs[target_labels], new_cost, epsilon):
+                continue
+            bag = bags.setdefault(nxt, [])
+            if bag and _eps_dominated(costs[bag], new_cost, epsilon):
+                continue
+            if count >= max_labels:
+                truncated = True
+                break
+
+            # Retire labels the new one dominates, then insert it
+            if bag:
+                dominated = np.all(new_cost <= costs[bag], axis=1)
+                if dominated.any():
+                    keep = []
+                    for existing, is_dominated in zip(bag, dominated.tolist()):
+                        if is_dominated:
+                            alive[existing] = False
+                        else:
+                            keep.append(existing)
+                    bag[:] = keep
+
+            costs[count] = new_cost
+            label_node[count] = nxt
+            label_pred[count] = label
+            label_edge[count] = edge_id
+            label_hops[count] = label_hops[label] + 1
+            alive[count] = True
+            bag.append(count)
+            heapq.heappush(heap, (float(new_cost[0]), count))
+            count += 1
+
+        if truncated:
+            break
+
+    paths: List[ParetoPath] = []
+    for label in target_labels:
+        if not alive[label]:
+            continue
+        hops = int(label_hops[label])
+        edge_ids = np.empty(hops, dtype=np.int32)
+        current = label
+        for i in range(hops - 1, -1, -1):
+            edge_ids[i] = label_edge[current]
+            current = label_pred[current]
+        paths.append(ParetoPath(edge_ids, tuple(float(c) for c in costs[label])))
+
+    return ParetoSearchResult(paths, count, truncated)
+
+
+def select_diverse(paths: List[ParetoPath], max_paths: int) -> List[ParetoPath]:
+    """
+    Pick up to max_paths spread-out paths from a Pareto front.
+
+    Starts with the best path for each criterion, then repeatedly adds the
+    path farthest (in normalized cost space) from those already chosen.
+    """
+    if len(paths) <= max_paths:
+        return sorted(paths, key=lambda p: p.costs)
+
+    matrix = np.array([p.costs for p in paths], dtype=np.float64)
+    span = matrix.max(axis=0) - matrix.min(axis=0)
+    span[span == 0] = 1.0
+    normalized = (matrix - matrix.min(axis=0)) / span
+
+    chosen: List[int] = []
+    for criterion in range(matrix.shape[1]):
+        best = int(np.argmin(matrix[:, criterion]))
+        if best not in chosen and len(chosen) < max_paths:
+            chosen.append(best)
+
+    while len(chosen) < max_paths:
+        distances = np.min(
+            np.linalg.norm(normalized[:, None, :] - normalized[None, chosen, :], axis=2), axis=1
+        )
+        distances[chosen] = -1.0
+        chosen.append(int(np.argmax(distances)))
+
+    return sorted((paths[i] for i in chosen), key=lambda p: p.costs)
+
+
+__all__ = [
+    "ParetoPath",
+    "ParetoSearchResult",
+    "pareto_search",
+    "select_diverse",
+    "MAX_LABELS",
+    "MAX_RUNTIME_MS",
+    "DEFAULT_EPSILON",
+]
@@ -0,0 +1,204 @@
+"""
+Route precomputation for hot OD pairs and event venues.
+
+- Hot pairs come from the analytics store (most requested OD pairs) and
+  from the event_simulation config (likely origins <-> venue)
+- Routes and alternatives are computed in parallel straight into the
+  route cache, for the current congestion and for the event's forecast
+  congestion (roads touching the venue scaled by traffic_multiplier)
+- After every congestion version bump the registered pairs are re-warmed
+  in the background, so the first users after gates open hit the cache
+- forecast_routes() serves the forecast entries (/routes/forecast)
+- warm_coverage() reports how many hot pairs are warm right now
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import database
+import event_simulation
+import graph_engine
+
+
+# Worker threads per warm-up run
+PRECOMPUTE_WORKERS = 4
+
+# OD pairs taken from the analytics store by default
+ANALYTICS_TOP_N = 10
+
+# Upper bound for forecast congestion factors
+FORECAST_MAX_FACTOR = 3.0
+
+# Pairs kept warm across congestion version bumps
+HOT_PAIRS: Set[Tuple[str, str]] = set()
+
+# Event types whose forecast routes are kept warm
+FORECAST_EVENTS: Set[str] = set()
+
+LAST_RUN: Dict[str, Any] = {}
+
+_state_lock = threading.Lock()
+_rewarm_pending = False
+_rewarm_running = False
+
+
+def hot_pairs_from_analytics(top_n: int = ANALYTICS_TOP_N) -> List[Tuple[str, str]]:
+    """Most frequent (origin, destination) pairs in the analytics store."""
+    counts = Counter(
+        (record["route"][0], record["route"][-1])
+        for record in database.APP_STATS["route_requests"]
+        if len(record["route"]) >= 2
+    )
+    return [pair for pair, _ in counts.most_common(top_n)]
+
+
+def hot_pairs_from_event(event_type: str) -> List[Tuple[str, str]]:
+    """Arrival (origin -> venue) and departure (venue -> origin) pairs."""
+    config = event_simulation.EVENT_CONFIGS[event_type]
+    venue = config["venue_node"]
+    pairs = []
+    for origin in config["likely_origins"]:
+        pairs.append((origin, venue))
+        pairs.append((venue, origin))
+    return pairs
+
+
+def forecast_factors(event_type: str) -> Dict[str, float]:
+    """Forecast congestion: roads touching the venue scaled by traffic_multiplier."""
+    config = event_simulation.EVENT_CONFIGS[event_type]
+    venue = config["venue_node"]
+    graph_engine.load_graph()
+    factors: Dict[str, float] = {}
+    for u, v in graph_engine.EDGE_INDEX:
+        if venue in (u, v) and u < v:
+            current = graph_engine.G.edges[u, v]["congestion_factor"]
+            factors[f"{u}-{v}"] = round(min(current * config["traffic_multiplier"], FORECAST_MAX_FACTOR), 2)
+    return factors
+
+
+def forecast_routes(source: str, destination: str, event_type: str) -> Dict[str, Any]:
+    """Routes under an event's forecast congestion, from the cache when warm."""
+    if event_type not in event_simulation.EVENT_CONFIGS:
+        return {"error": "Unknown event type"}
+    result = graph_engine.get_forecast_routes(source, destination, event_type, forecast_factors(event_type))
+    if "error" not in result:
+        result["event_type"] = event_type
+    return result
+
+
+def _warm(pairs: List[Tuple[str, str]], forecasts: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """Compute current + forecast routes for every pair in parallel."""
+    jobs: List[Tuple[str, str, Optional[Dict[str, float]], Optional[str]]] = [
+        (source, destination, None, None) for source, destination in pairs
+    ]
+    for tag, factors in forecasts.items():
+        jobs.extend((source, destination, factors, tag) for source, destination in pairs)
+
+    started = time.perf_counter()
+    version = graph_engine.get_congestion_version()
+    with ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS) as pool:
+        results = list(pool.map(lambda job: graph_engine.warm_routes(*job), jobs))
+
+    summary = {
+        "congestion_version": version,
+        "pairs": len(pairs),
+        "jobs": len(jobs),
+        "routes_warmed": sum(results),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "finished_at": time.time(),
+    }
+    LAST_RUN.clear()
+    LAST_RUN.update(summary)
+    return summary
+
+
+def precompute(event_type: Optional[str] = None, top_n: int = ANALYTICS_TOP_N) -> Dict[str, Any]:
+    """
+    Register hot pairs and warm the route cache for them.
+
+    - top_n most frequent pairs from analytics (0 to skip)
+    - event_type adds its origin/venue pairs and forecast congestion
+    """
+    pairs = hot_pairs_from_analytics(top_n) if top_n > 0 else []
+    if event_type is not None:
+        if event_type not in event_simulation.EVENT_CONFIGS:
+            return {"error": "Unknown event type"}
+        pairs.extend(hot_pairs_from_event(event_type))
+
+    with _state_lock:
+        HOT_PAIRS.update(pairs)
+        if event_type is not None:
+            FORECAST_EVENTS.add(event_type)
+        all_pairs = sorted(HOT_PAIRS)
+        events = sorted(FORECAST_EVENTS)
+
+    return _warm(all_pairs, {event: forecast_factors(event) for event in events})
+
+
+def _rewarm_loop() -> None:
+    global _rewarm_pending, _rewarm_running
+    while True:
+        with _state_lock:
+            if not _rewarm_pending:
+                _rewarm_running = False
+                return
+            _rewarm_pending = False
+            pairs = sorted(HOT_PAIRS)
+            events = sorted(FORECAST_EVENTS)
+        _warm(pairs, {event: forecast_factors(event) for event in events})
+
+
+def _on_version_bump(version: int) -> None:
+    """Re-warm hot pairs in the background; bursts of bumps coalesce."""
+    global _rewarm_pending, _rewarm_running
+    with _state_lock:
+        if not HOT_PAIRS:
+            return
+        _rewarm_pending = True
+        if _rewarm_running:
+            return
+        _rewarm_running = True
+    threading.Thread(target=_rewarm_loop, name="fluxora-rewarm", daemon=True).start()
+
+
+graph_engine.add_version_listener(_on_version_bump)
+
+
+def warm_coverage() -> Dict[str, Any]:
+    """Share of hot pairs whose routes are cached for the current version."""
+    with _state_lock:
+        pairs = sorted(HOT_PAIRS)
+        events = sorted(FORECAST_EVENTS)
+
+    warm = [pair for pair in pairs if graph_engine.is_route_warm(*pair)]
+    forecast = {
+        event: sum(graph_engine.is_route_warm(source, destination, event) for source, destination in pairs)
+        for event in events
+    }
+    return {
+        "congestion_version": graph_engine.get_congestion_version(),
+        "hot_pairs": len(pairs),
+        "warm_pairs": len(warm),
+        "coverage": round(len(warm) / len(pairs), 3) if pairs else 0.0,
+        "cold_pairs": [f"{s}-{d}" for s, d in pairs if (s, d) not in set(warm)],
+        "forecast_warm_pairs": forecast,
+        "rewarm_in_progress": _rewarm_running,
+        "last_run": dict(LAST_RUN),
+        "cache": graph_engine.ROUTE_CACHE.stats(),
+    }
+
+
+__all__ = [
+    "HOT_PAIRS",
+    "precompute",
+    "warm_coverage",
+    "forecast_factors",
+    "forecast_routes",
+    "hot_pairs_from_analytics",
+    "hot_pairs_from_event",
+]
@@ -0,0 +1,80 @@
+"""
+Route cache for Fluxora prototype.
+
+- Small in-process LRU cache for computed route results
+- Keys carry the congestion/load versions they were computed under,
+  so a version bump simply makes old entries unreachable
+- Values are compact, immutable RouteResult objects (or tuples of them),
+  so entries are shared without copying; callers serialize on the way out
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+# Upper bound on cached route results kept in memory
+DEFAULT_MAX_ENTRIES = 2048
+
+
+class RouteCache:
+    """Thread-safe LRU cache mapping route keys to result objects."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def contains(self, key: Hashable) -> bool:
+        """Check for a key without touching LRU order or hit counters."""
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value (treated as immutable), evicting the LRU entry."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return simple size and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Shared cache used by graph_engine
+ROUTE_CACHE = RouteCache()
+
+# Load-aware results churn with the load version; keeping them apart means
+# they can never evict regular or precomputed routes from ROUTE_CACHE
+LOAD_AWARE_CACHE = RouteCache(max_entries=256)
+
+
+__all__ = ["RouteCache", "ROUTE_CACHE", "LOAD_AWARE_CACHE"]
@@ -0,0 +1,76 @@
+"""
+Compact route result type for Fluxora prototype.
+
+- Stores a route as int32 node-id and edge-id arrays instead of label lists
+- total_time and mean congestion come from vectorized gathers over the
+  per-edge arrays of the graph snapshot
+- Node labels are only materialized when a result is serialized
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+class RouteResult:
+    """Immutable, array-backed route (safe to share through the route cache)."""
+
+    __slots__ = ("node_ids", "edge_ids", "total_time", "congestion_score", "strategy")
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        edge_ids: np.ndarray,
+        total_time: float,
+        congestion_score: float,
+        strategy: Optional[str] = None,
+    ) -> None:
+        self.node_ids = node_ids
+        self.edge_ids = edge_ids
+        self.total_time = total_time
+        self.congestion_score = congestion_score
+        self.strategy = strategy
+
+    @classmethod
+    def from_edges(
+        cls,
+        source_id: int,
+        edge_ids: np.ndarray,
+        edge_targets: np.ndarray,
+        edge_times: np.ndarray,
+        edge_congestion: np.ndarray,
+        strategy: Optional[str] = None,
+    ) -> "RouteResult":
+        """
+        Build a result from the edge ids of a path.
+
+        edge_times holds base_time * congestion_factor per edge and
+        edge_congestion the congestion_factor per edge.
+        """
+        node_ids = np.empty(edge_ids.size + 1, dtype=np.int32)
+        node_ids[0] = source_id
+        node_ids[1:] = edge_targets[edge_ids]
+        if edge_ids.size:
+            total_time = float(edge_times[edge_ids].sum())
+            congestion_score = float(edge_congestion[edge_ids].mean())
+        else:
+            total_time = 0.0
+            congestion_score = 0.0
+        return cls(node_ids, edge_ids, total_time, congestion_score, strategy)
+
+    def with_strategy(self, strategy: str) -> "RouteResult":
+        """Return the same route labelled with another strategy name."""
+        return RouteResult(self.node_ids, self.edge_ids, self.total_time, self.congestion_score, strategy)
+
+    def labels(self, node_labels: Sequence[str]) -> List[str]:
+        """Materialize the node labels of the route."""
+        return [node_labels[node_id] for node_id in self.node_ids.tolist()]
+
+    def same_path(self, other: "RouteResult") -> bool:
+        """True if both results use exactly the same edges."""
+        return np.array_equal(self.edge_ids, other.edge_ids) and self.node_ids[0] == other.node_ids[0]
+
+
+__all__ = ["RouteResult"]
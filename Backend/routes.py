@@ -5,19 +5,29 @@ Simple FastAPI router that wires together:
 - graph_engine for optimal routes
 - congestion_model for simulated congestion + heatmap
 - database for lightweight in-memory analytics
+
+Backend modules are wrapped in lazy proxies so importing this router
+(and therefore main.py) does not pull in networkx/numpy or build the
+graph; that happens in the lifespan preload or on first use.
 """
 
 from __future__ import annotations
 
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
 
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from startup import lazy_module
+from traffic_replay import TRAFFIC_RECORDER
 
-from graph_engine import get_optimal_route, get_multiple_routes, set_emergency_mode, get_emergency_mode
-from congestion_model import update_congestion as calculate_congestion, get_heatmap_data
-from database import log_route, log_incentive, get_dashboard_stats
-from event_simulation import simulate_event_scenario, get_post_event_insights
+
+graph_engine = lazy_module("graph_engine")
+congestion_model = lazy_module("congestion_model")
+database = lazy_module("database")
+event_simulation = lazy_module("event_simulation")
+precompute = lazy_module("precompute")
 
 
 router = APIRouter()
@@ -28,6 +38,24 @@ class RouteRequest(BaseModel):
 
     source: str
     destination: str
+    load_aware: bool = False  # spread users over near-optimal alternatives
+
+
+class ParetoRouteRequest(BaseModel):
+    """Request body for /routes/pareto endpoint."""
+
+    source: str
+    destination: str
+    max_routes: int = Field(4, ge=1, le=10)
+    epsilon: float = Field(0.05, ge=0.0, le=1.0)  # dominance relaxation
+
+
+class ForecastRouteRequest(BaseModel):
+    """Request body for /routes/forecast endpoint."""
+
+    source: str
+    destination: str
+    event_type: str = "festival"
 
 
 class EmergencyModeRequest(BaseModel):
@@ -42,6 +70,32 @@ class EventSimulationRequest(BaseModel):
     event_type: str = "festival"
 
 
+class PrecomputeRequest(BaseModel):
+    """Request body for /cache/precompute endpoint."""
+
+    event_type: Optional[str] = None  # also warm venue pairs and forecast routes
+    top_n: int = Field(10, ge=0, le=100)  # most requested OD pairs to keep warm
+
+
+def _congestion_version() -> Optional[int]:
+    """
+    Congestion version for the traffic log (only read when recording).
+
+    The routing state behind the version is logged the first time it is
+    seen, so replay can restore it.
+    """
+    if not TRAFFIC_RECORDER.enabled:
+        return None
+    return TRAFFIC_RECORDER.record_state(graph_engine.get_routing_snapshot())
+
+
+def _record(endpoint: str, payload: BaseModel, result: Dict[str, Any],
+            version: Optional[int], started_at: float) -> None:
+    """Append a call to the traffic log when FLUXORA_RECORD_PATH is set."""
+    if TRAFFIC_RECORDER.enabled:
+        TRAFFIC_RECORDER.record(endpoint, payload.model_dump(), result, version, started_at)
+
+
 @router.get("/")
 def health_check() -> Dict[str, str]:
     """Basic health check endpoint."""
@@ -54,24 +108,29 @@ def calculate_route(payload: RouteRequest) -> Dict[str, Any]:
     Calculate an optimal route between two points.
 
     - First, update congestion to simulate changing traffic.
-    - Then, compute the optimal route using graph_engine.
+    - Then, compute the optimal route using graph_engine
+      (load-aware if requested, to avoid self-induced congestion).
     - Log route stats in the in-memory "database".
     - If congestion is low enough, grant a simple incentive.
     """
+    started_at = time.time()
+    version = _congestion_version()
+
     # Update simulated congestion before each calculation
-    calculate_congestion()
+    congestion_model.update_congestion()
 
     # Call graph engine to get best route using current congestion
-    result = get_optimal_route(payload.source, payload.destination)
+    result = graph_engine.get_optimal_route(payload.source, payload.destination, load_aware=payload.load_aware)
 
     # If the graph engine could not find a route, just return the error shape
     if "error" in result:
+        _record("/route", payload, result, version, started_at)
         return result
 
     congestion_score = float(result.get("congestion_score", 1.0))
 
     # Log that we calculated a route with this congestion level
-    log_route(congestion_score)
+    database.log_route(congestion_score)
 
     # Simple incentive rule: reward points for low congestion routes
     reward_points = 0
@@ -83,12 +142,13 @@ def calculate_route(payload: RouteRequest) -> Dict[str, Any]:
         reward_points = 5   # Small reward for any route
         
     if reward_points > 0:
-        log_incentive(result.get("route", []), reward_points)
+        database.log_incentive(result.get("route", []), reward_points)
 
     response: Dict[str, Any] = dict(result)
     if reward_points > 0:
         response["reward_points"] = reward_points
 
+    _record("/route", payload, response, version, started_at)
     return response
 
 
@@ -101,17 +161,20 @@ def calculate_multiple_routes(payload: RouteRequest) -> Dict[str, Any]:
     - Each route uses different optimization strategy
     - Provides alternatives for users to choose from
     """
+    started_at = time.time()
+    version = _congestion_version()
+
     # Update simulated congestion before each calculation
-    calculate_congestion()
+    congestion_model.update_congestion()
 
     # Get multiple route options
-    results = get_multiple_routes(payload.source, payload.destination)
+    results = graph_engine.get_multiple_routes(payload.source, payload.destination)
 
     # Log the best route for analytics
     if results and len(results) > 0 and "error" not in results[0]:
         best_route = results[0]  # First route is typically the fastest
         congestion_score = float(best_route.get("congestion_score", 1.0))
-        log_route(congestion_score)
+        database.log_route(congestion_score)
 
         # Check for incentives on the best route
         reward_points = 0
@@ -123,16 +186,42 @@ def calculate_multiple_routes(payload: RouteRequest) -> Dict[str, Any]:
             reward_points = 5   # Small reward for any route
             
         if reward_points > 0:
-            log_incentive(best_route.get("route", []), reward_points)
+            database.log_incentive(best_route.get("route", []), reward_points)
         
         # Add reward points to the best route
         if reward_points > 0:
             best_route["reward_points"] = reward_points
 
-    return {
+    response = {
         "routes": results,
         "total_options": len(results)
     }
+    _record("/routes/multiple", payload, response, version, started_at)
+    return response
+
+
+@router.post("/routes/pareto")
+def calculate_pareto_routes(payload: ParetoRouteRequest) -> Dict[str, Any]:
+    """
+    Calculate the Pareto trade-off routes between two points.
+
+    - Balances travel time, congestion exposure and estimated CO2
+    - Returns a small, diverse subset of the Pareto front
+    """
+    return graph_engine.get_pareto_routes(
+        payload.source, payload.destination, payload.max_routes, payload.epsilon
+    )
+
+
+@router.post("/routes/forecast")
+def calculate_forecast_routes(payload: ForecastRouteRequest) -> Dict[str, Any]:
+    """
+    Calculate routes for an event's forecast congestion.
+
+    - Roads around the event venue are scaled by its traffic multiplier
+    - Served from the cache when /cache/precompute warmed the pair
+    """
+    return precompute.forecast_routes(payload.source, payload.destination, payload.event_type)
 
 
 @router.get("/heatmap")
@@ -142,10 +231,34 @@ def get_heatmap() -> Dict[str, Any]:
 
     Frontend can use this to color roads based on congestion factor.
     """
-    data = get_heatmap_data()
+    data = congestion_model.get_heatmap_data()
     return {"heatmap": data}
 
 
+@router.get("/congestion/history")
+def get_congestion_history_endpoint(
+    road: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resolution: str = "raw",
+) -> Dict[str, Any]:
+    """
+    Return recorded congestion history.
+
+    - road: road key like "A-B" (all roads if omitted)
+    - start/end: unix timestamps (defaults to the last hour)
+    - resolution: "raw", "minute" or "hour"
+    """
+    if resolution not in ("raw", "minute", "hour"):
+        return {"error": "Unknown resolution"}
+    if road is not None and road not in congestion_model.ROAD_CONGESTION:
+        return {"error": "Road not found"}
+
+    end = time.time() if end is None else end
+    start = end - 3600 if start is None else start
+    return congestion_model.get_congestion_history(start, end, road, resolution)
+
+
 @router.get("/dashboard")
 def get_dashboard() -> Dict[str, Any]:
     """
@@ -153,7 +266,7 @@ def get_dashboard() -> Dict[str, Any]:
 
     Includes total routes calculated, incentives given, and average congestion.
     """
-    stats = get_dashboard_stats()
+    stats = database.get_dashboard_stats()
     return stats
 
 
@@ -165,18 +278,22 @@ def set_emergency_mode_endpoint(payload: EmergencyModeRequest) -> Dict[str, Any]
     When enabled, increases congestion penalties near critical zones
     like hospitals and highways.
     """
-    set_emergency_mode(payload.enabled)
-    return {
-        "emergency_mode": get_emergency_mode(),
+    started_at = time.time()
+    version = _congestion_version()
+    graph_engine.set_emergency_mode(payload.enabled)
+    response = {
+        "emergency_mode": graph_engine.get_emergency_mode(),
         "message": f"Emergency mode {'enabled' if payload.enabled else 'disabled'}"
     }
+    _record("/emergency-mode", payload, response, version, started_at)
+    return response
 
 
 @router.get("/emergency-mode")
 def get_emergency_mode_endpoint() -> Dict[str, Any]:
     """Get current emergency mode status."""
     return {
-        "emergency_mode": get_emergency_mode()
+        "emergency_mode": graph_engine.get_emergency_mode()
     }
 
 
@@ -188,7 +305,7 @@ def simulate_event_endpoint(payload: EventSimulationRequest) -> Dict[str, Any]:
     Analyzes current traffic patterns and suggests optimal arrival times
     to minimize congestion during events.
     """
-    return simulate_event_scenario(payload.event_type)
+    return event_simulation.simulate_event_scenario(payload.event_type)
 
 
 @router.get("/event/post-insights")
@@ -199,7 +316,25 @@ def get_post_event_insights_endpoint() -> Dict[str, Any]:
     Returns estimated impact metrics including congestion reduction,
     time saved, and environmental benefits after an event.
     """
-    return get_post_event_insights()
+    return event_simulation.get_post_event_insights()
+
+
+@router.post("/cache/precompute")
+def precompute_routes(payload: PrecomputeRequest) -> Dict[str, Any]:
+    """
+    Precompute routes for hot OD pairs into the route cache.
+
+    - Hot pairs are the most requested ones plus, for an event, the
+      likely origins to and from its venue
+    - Registered pairs are re-warmed after every congestion change
+    """
+    return precompute.precompute(payload.event_type, payload.top_n)
+
+
+@router.get("/cache/warm-coverage")
+def get_warm_coverage() -> Dict[str, Any]:
+    """Return how many hot OD pairs are currently served from the cache."""
+    return precompute.warm_coverage()
 
 
 __all__ = ["router"]
@@ -0,0 +1,156 @@
+"""
+Startup helpers for Fluxora prototype backend.
+
+- Lazy module proxies so heavy modules (networkx, numpy, simulation code)
+  are only imported on first use or by the background preload
+- Preload run from the FastAPI lifespan handler, with a readiness flag
+  that is separate from liveness (/health)
+- Optional startup profile that reports import/init time per module
+
+Environment variables:
+- FLUXORA_PRELOAD: comma separated modules to preload in the background,
+  "none" to disable (default: all backend modules)
+- FLUXORA_STARTUP_PROFILE=1: print per-module import/init timings
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# Captured as early as possible (main.py imports this module first)
+PROCESS_START = time.monotonic()
+
+STARTUP_PROFILE = os.getenv("FLUXORA_STARTUP_PROFILE", "0") == "1"
+
+# Third-party dependencies timed separately in profile mode
+HEAVY_DEPENDENCIES = ["numpy", "networkx"]
+
+# Backend modules preloaded by default, in dependency order
+DEFAULT_PRELOAD = ["congestion_model", "database", "graph_engine", "event_simulation"]
+
+# Per-module initialization run after import during preload
+INIT_HOOKS = {"graph_engine": "load_graph"}
+
+# Import/init durations in milliseconds, keyed by module or step name
+STARTUP_TIMINGS: Dict[str, float] = {}
+
+READINESS: Dict[str, Any] = {
+    "ready": False,
+    "error": None,
+    "ready_after_ms": None,
+}
+
+
+def _preload_modules() -> List[str]:
+    raw = os.getenv("FLUXORA_PRELOAD")
+    if raw is None:
+        return list(DEFAULT_PRELOAD)
+    if raw.strip().lower() in ("", "none", "0", "false"):
+        return []
+    return [name.strip() for name in raw.split(",") if name.strip()]
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Record how long the wrapped block took under STARTUP_TIMINGS[name]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS.setdefault(name, round((time.perf_counter() - start) * 1000, 2))
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        with self._lock:
+            if self._module is None:
+                with timed(self._name):
+                    self._module = importlib.import_module(self._name)
+            return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self._module if self._module is not None else self._load()
+        return getattr(module, attr)
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Return a proxy for module `name` without importing it yet."""
+    return LazyModule(name)
+
+
+def run_preload() -> None:
+    """
+    Import configured modules and run their init hooks.
+
+    Runs in a worker thread from the lifespan handler, so /health keeps
+    answering while the graph and heavy dependencies load.
+    """
+    try:
+        if STARTUP_PROFILE:
+            for dependency in HEAVY_DEPENDENCIES:
+                with timed(dependency):
+                    importlib.import_module(dependency)
+
+        for name in _preload_modules():
+            with timed(name):
+                module = importlib.import_module(name)
+            hook = INIT_HOOKS.get(name)
+            if hook:
+                with timed(f"{name}.{hook}"):
+                    getattr(module, hook)()
+    except Exception as exc:  # keep the process alive; readiness reports it
+        READINESS["error"] = f"{type(exc).__name__}: {exc}"
+        return
+
+    READINESS["ready"] = True
+    READINESS["ready_after_ms"] = round((time.monotonic() - PROCESS_START) * 1000, 2)
+
+    if STARTUP_PROFILE:
+        print(format_startup_report())
+
+
+def get_startup_report() -> Dict[str, Any]:
+    """Return readiness state plus per-module timings."""
+    return {
+        "ready": READINESS["ready"],
+        "error": READINESS["error"],
+        "ready_after_ms": READINESS["ready_after_ms"],
+        "uptime_ms": round((time.monotonic() - PROCESS_START) * 1000, 2),
+        "timings_ms": dict(STARTUP_TIMINGS),
+    }
+
+
+def format_startup_report() -> str:
+    """Human readable startup profile, slowest steps first."""
+    lines = ["Fluxora startup profile (ms):"]
+    for name, ms in sorted(STARTUP_TIMINGS.items(), key=lambda item: -item[1]):
+        lines.append(f"  {ms:10.2f}  {name}")
+    lines.append(f"  ready after {READINESS['ready_after_ms']} ms since process start")
+    return "\n".join(lines)
+
+
+__all__ = [
+    "PROCESS_START",
+    "STARTUP_PROFILE",
+    "STARTUP_TIMINGS",
+    "READINESS",
+    "timed",
+    "lazy_module",
+    "run_preload",
+    "get_startup_report",
+    "format_startup_report",
+]
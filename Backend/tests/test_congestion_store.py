@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+import congestion_store
+from congestion_store import CongestionStore
+
+
+ROADS = ["A-B", "B-C", "C-D"]
+T0 = 1_000_000 * 3600.0  # on an hour boundary
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(congestion_store, "CHUNK_TICKS", 8)
+
+
+def _fill(store, n, step=30.0):
+    for i in range(n):
+        store.append([1.0 + i / 100, 2.0, 1.5], T0 + i * step)
+
+
+def test_append_and_range_across_chunks(tmp_path, small_chunks):
+    store = CongestionStore(ROADS, str(tmp_path))
+    _fill(store, 20)
+
+    ts, values = store.range(T0 + 5 * 30, T0 + 12 * 30)
+    assert ts.tolist() == [T0 + i * 30 for i in range(5, 13)]
+    assert values.shape == (8, 3)
+    assert np.allclose(values[:, 1], 2.0)
+
+    ts, series = store.road_series("A-B", T0, T0 + 2 * 30)
+    assert np.allclose(series, [1.0, 1.01, 1.02], atol=1e-2)  # float16 storage
+    assert store.stats()["raw_chunks"] == 3
+
+
+def test_out_of_order_ticks_stay_monotonic(tmp_path):
+    store = CongestionStore(ROADS, str(tmp_path))
+    store.append([1.0, 1.0, 1.0], T0 + 60)
+    store.append([2.0, 2.0, 2.0], T0)  # late tick is clamped, not inserted before
+
+    ts, _ = store.range(T0, T0 + 120)
+    assert ts.tolist() == [T0 + 60, T0 + 60]
+
+
+def test_retention_drops_oldest_chunks(tmp_path, small_chunks):
+    store = CongestionStore(ROADS, str(tmp_path), max_raw_chunks=2)
+    _fill(store, 40)
+
+    stats = store.stats()
+    assert stats["raw_chunks"] <= 2
+    assert stats["oldest_tick"] > T0
+    assert len(list(tmp_path.glob("raw_*.ts"))) == stats["raw_chunks"]
+
+
+def test_retention_by_age(tmp_path, small_chunks):
+    store = CongestionStore(ROADS, str(tmp_path), raw_retention_seconds=300)
+    _fill(store, 40)
+
+    ts, _ = store.range(0, float("inf"))
+    assert ts[0] >= T0 + 39 * 30 - 300 - 8 * 30  # at most one chunk beyond the cutoff
+
+
+def test_rollups_aggregate_and_survive_reopen(tmp_path):
+    store = CongestionStore(ROADS, str(tmp_path))
+    _fill(store, 10)  # 5 minutes, two ticks per minute
+    minutes = store.aggregates(T0, T0 + 3600, "minute")
+
+    assert minutes["count"].tolist() == [2] * 5
+    assert np.allclose(minutes["mean"][:, 1], 2.0)
+    assert np.allclose(minutes["max"][:, 0], [1.01, 1.03, 1.05, 1.07, 1.09], atol=1e-6)
+
+    hours_before = store.aggregates(T0, T0 + 3600, "hour")
+    store.close()
+    reopened = CongestionStore(ROADS, str(tmp_path))
+    hours_after = reopened.aggregates(T0, T0 + 3600, "hour")
+
+    assert not reopened.stats()["private"]
+    assert hours_after["count"].tolist() == hours_before["count"].tolist() == [10]
+    assert np.allclose(hours_after["mean"], hours_before["mean"])
+
+    # A tick in the same hour keeps accumulating into the restored bucket
+    reopened.append([1.0, 2.0, 1.5], T0 + 10 * 30)
+    assert reopened.aggregates(T0, T0 + 3600, "hour")["count"].tolist() == [11]
+
+
+def test_second_writer_gets_private_directory(tmp_path):
+    owner = CongestionStore(ROADS, str(tmp_path))
+    owner.append([1.0, 1.0, 1.0], T0)
+    other = CongestionStore(ROADS, str(tmp_path))
+    other.append([2.0, 2.0, 2.0], T0 + 1)
+
+    assert not owner.stats()["private"]
+    assert other.stats()["private"]
+    assert other.directory != str(tmp_path)
+    assert owner.range(T0, T0 + 10)[0].tolist() == [T0]
+
+
+def test_rolling_std_and_cv_need_min_samples(tmp_path):
+    store = CongestionStore(ROADS, str(tmp_path))
+    store.append([1.0, 2.0, 1.5])
+    assert np.isnan(store.rolling_cv(60, min_samples=2)).all()
+
+    store.append([3.0, 2.0, 1.5])
+    assert np.allclose(store.rolling_std(60, min_samples=2), [1.0, 0.0, 0.0])
+    assert np.allclose(store.rolling_cv(60, min_samples=2), [0.5, 0.0, 0.0])
+
+
+def test_rolling_stats_expire_when_ticks_stop(tmp_path, monkeypatch):
+    now = [T0]
+    monkeypatch.setattr(congestion_store.time, "time", lambda: now[0])
+    store = CongestionStore(ROADS, str(tmp_path))
+    store.append([1.0, 2.0, 1.5])
+    store.append([3.0, 2.0, 1.5])
+    assert np.allclose(store.rolling_std(60, min_samples=2), [1.0, 0.0, 0.0])
+
+    # No new ticks: once the window has passed, the cached stats must not be served
+    now[0] += 120
+    assert np.isnan(store.rolling_cv(60, min_samples=2)).all()
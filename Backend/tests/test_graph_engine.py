@@ -0,0 +1,109 @@
+import itertools
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import graph_engine
+from route_result import RouteResult
+
+
+@pytest.fixture
+def engine():
+    graph_engine.load_graph()
+    yield graph_engine
+    graph_engine.set_emergency_mode(False)
+
+
+@pytest.mark.parametrize("emergency", [False, True])
+def test_pareto_total_time_matches_route(engine, emergency):
+    engine.set_emergency_mode(emergency)
+    route = engine.get_optimal_route("A", "D")
+    pareto = engine.get_pareto_routes("A", "D")["routes"]
+
+    same = [r for r in pareto if r["route"] == route["route"]]
+    assert same
+    # total_time is unpenalized everywhere; only travel_time carries the penalty
+    assert same[0]["total_time"] == route["total_time"]
+    if emergency:
+        assert same[0]["travel_time"] > same[0]["total_time"]
+    else:
+        assert same[0]["travel_time"] == pytest.approx(same[0]["total_time"], abs=0.01)
+
+
+def _nx_graph(engine, weights):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(len(engine.NODES)))
+    for edge_id, (u, v) in enumerate(zip(engine._EDGE_SOURCE_LIST, engine._EDGE_TARGET_LIST)):
+        graph.add_edge(u, v, weight=float(weights[edge_id]))
+    return graph
+
+
+@pytest.mark.parametrize("emergency", [False, True])
+@pytest.mark.parametrize("seed", [None, 1, 2, 3])
+def test_dijkstra_matches_networkx_for_every_pair(engine, emergency, seed):
+    congestion = None
+    if seed is not None:
+        congestion = np.random.default_rng(seed).uniform(1.0, 3.0, len(engine.EDGES))
+    weights = engine._edge_weights(congestion=congestion, emergency=emergency)
+    graph = _nx_graph(engine, weights)
+
+    n = len(engine.NODES)
+    for source, target in itertools.permutations(range(n), 2):
+        edge_ids = engine._dijkstra(source, target, weights.tolist())
+        assert edge_ids is not None
+        expected = nx.dijkstra_path_length(graph, source, target)
+        assert float(weights[edge_ids].sum()) == pytest.approx(expected)
+
+        # The edge ids form a connected path from source to target
+        nodes = [source] + [engine._EDGE_TARGET_LIST[e] for e in edge_ids]
+        assert nodes[-1] == target
+        for edge_id, u in zip(edge_ids, nodes[:-1]):
+            assert engine._EDGE_SOURCE_LIST[edge_id] == u
+
+
+def test_dijkstra_source_equals_destination(engine):
+    weights = engine._edge_weights().tolist()
+    for node in range(len(engine.NODES)):
+        edge_ids = engine._dijkstra(node, node, weights)
+        assert edge_ids is not None and edge_ids.size == 0
+
+
+def test_dijkstra_unreachable_target(engine, monkeypatch):
+    target = engine.NODE_INDEX["D"]
+    # Drop every edge into D
+    out_edges = [
+        [e for e in edges if engine._EDGE_TARGET_LIST[e] != target] for edges in engine._OUT_EDGES
+    ]
+    monkeypatch.setattr(engine, "_OUT_EDGES", out_edges)
+
+    weights = engine._edge_weights().tolist()
+    assert engine._dijkstra(engine.NODE_INDEX["A"], target, weights) is None
+    assert engine._dijkstra(target, engine.NODE_INDEX["A"], weights) is not None
+
+
+def test_route_result_gathers():
+    edge_targets = np.array([1, 2, 3, 0], dtype=np.int32)
+    edge_times = np.array([5.0, 7.5, 2.0, 100.0])
+    edge_congestion = np.array([1.0, 2.0, 1.5, 9.0])
+
+    result = RouteResult.from_edges(0, np.array([0, 1, 2], dtype=np.int32), edge_targets, edge_times, edge_congestion)
+    assert result.node_ids.tolist() == [0, 1, 2, 3]
+    assert result.total_time == pytest.approx(14.5)
+    assert result.congestion_score == pytest.approx(1.5)
+
+    empty = RouteResult.from_edges(2, np.zeros(0, dtype=np.int32), edge_targets, edge_times, edge_congestion)
+    assert empty.node_ids.tolist() == [2]
+    assert empty.total_time == 0.0
+    assert empty.congestion_score == 0.0
+
+
+def test_route_totals_match_graph_attributes(engine):
+    for source, destination in itertools.permutations(engine.NODES, 2):
+        result = engine.get_optimal_route(source, destination)
+        route = result["route"]
+        edges = list(zip(route[:-1], route[1:]))
+        total = sum(engine.G.edges[u, v]["base_time"] * engine.G.edges[u, v]["congestion_factor"] for u, v in edges)
+        score = np.mean([engine.G.edges[u, v]["congestion_factor"] for u, v in edges])
+        assert result["total_time"] == pytest.approx(total, abs=0.01)
+        assert result["congestion_score"] == pytest.approx(score, abs=0.01)
@@ -0,0 +1,104 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import congestion_model
+import ingestion
+from ingestion import IngestionPipeline, _parse_csv, _parse_loop, synthetic_pings
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    # Keep tests away from the shared congestion state and history store
+    monkeypatch.setattr(congestion_model, "ROAD_CONGESTION", dict(congestion_model.ROAD_CONGESTION))
+    monkeypatch.setattr(congestion_model, "record_congestion_snapshot", lambda ts=None: None)
+    return IngestionPipeline(publish_to_graph=False)
+
+
+def test_parse_csv_skips_bad_lines():
+    data = _parse_csv([b"1,2,3,4", b"oops,2,3,4", b"1,2,3", b"5,6,7,8"], 4)
+    assert data.tolist() == [[1, 2, 3, 4], [5, 6, 7, 8]]
+
+
+def test_parse_csv_offsetting_bad_lines_are_not_merged():
+    # 3 + 5 fields add up to two rows of 4, but neither line is a valid row
+    assert _parse_csv([b"1,2,3", b"4,5,6,7,8"], 4).shape == (0, 4)
+    assert _parse_csv([b"1,2,3", b"9,9,9,9", b"4,5,6,7,8"], 4).tolist() == [[9, 9, 9, 9]]
+
+
+def test_parse_loop_skips_bad_lines():
+    road_index = {"A-B": 0, "B-C": 1}
+    lines = [
+        b"10,A-B,5,20",
+        b"oops,A-B,5,20",  # bad timestamp
+        b"11,B-C,x,20",  # bad count
+        b"12,Z-Z,5,20",  # unknown road
+        b"13,B-C,5",  # too few fields
+        b"14,B-C,4,30",
+    ]
+    assert _parse_loop(lines, road_index).tolist() == [[10, 0, 5, 20], [14, 1, 4, 30]]
+    assert _parse_loop([b"garbage"], road_index).shape == (0, 4)
+
+
+def test_malformed_loop_batch_does_not_stop_consumer(pipeline):
+    async def scenario():
+        consumer = asyncio.create_task(pipeline.run())
+        pipeline.submit("loop", [b"oops,A-B,5,20"])
+        pipeline.submit("loop", [b"0,A-B,5,10", b"1,A-B,5,10"])
+        await pipeline.stop()
+        await asyncio.wait_for(consumer, timeout=5)
+
+    asyncio.run(scenario())
+    assert pipeline.stats["batches_failed"] == 0
+    assert pipeline.stats["windows_published"] == 1
+
+
+def test_failing_batch_is_counted_and_skipped(pipeline):
+    async def scenario():
+        consumer = asyncio.create_task(pipeline.run())
+        pipeline.submit("not-a-kind", [b"1,2,3,4"])
+        pipeline.submit("loop", [b"0,A-B,5,10"])
+        await pipeline.stop()
+        await asyncio.wait_for(consumer, timeout=5)
+
+    asyncio.run(scenario())
+    assert pipeline.stats["batches_failed"] == 1
+    assert "not-a-kind" in pipeline.last_error
+    assert pipeline.stats["windows_published"] == 1
+
+
+def test_socket_rejects_missing_header(pipeline):
+    async def scenario():
+        server = await ingestion.start_socket_source(pipeline, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"0,A-B,5,10\n1,A-B,5,10\n")
+        await writer.drain()
+        reply = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return reply
+
+    assert asyncio.run(scenario()).startswith(b"error")
+    assert pipeline.queue.qsize() == 0
+
+
+def test_probe_window_publishes_congestion(pipeline):
+    lines = synthetic_pings(2000, start_ts=600.0, seconds=30.0)
+    lines += [b"nan,13.0,80.2,20", b"1,2,3", b"oops"]
+    pipeline.process_batch("probe", lines)
+    factors = pipeline.publish()
+
+    assert set(factors) == set(congestion_model.ROAD_CONGESTION)
+    assert all(ingestion.MIN_FACTOR <= f <= ingestion.MAX_FACTOR for f in factors.values())
+    assert congestion_model.ROAD_CONGESTION["A-B"] == factors["A-B"]
+
+
+def test_grid_match_rejects_far_pings(pipeline):
+    lat = np.array([congestion_model.LOCATION_COORDS["A"][0], 0.0])
+    lon = np.array([congestion_model.LOCATION_COORDS["A"][1], 0.0])
+    matched = pipeline.grid.match(lat, lon)
+    assert matched[0] >= 0
+    assert matched[1] == -1
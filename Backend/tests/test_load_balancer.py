@@ -0,0 +1,130 @@
+import threading
+
+import numpy as np
+import pytest
+
+import load_balancer
+from load_balancer import (
+    EDGE_CAPACITY,
+    LOAD_HALF_LIFE_SECONDS,
+    MAX_PENALTY_LEVEL,
+    PENALTY_STEP,
+    EdgeLoadTracker,
+    marginal_cost_multiplier,
+    penalty_levels,
+)
+
+
+class FakeClock:
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(load_balancer.time, "monotonic", fake)
+    return fake
+
+
+def test_load_decays_with_half_life(clock):
+    tracker = EdgeLoadTracker(3)
+    tracker.assign([0, 2], flow=8.0)
+
+    assert np.allclose(tracker.current_load(), [8.0, 0.0, 8.0])
+    assert np.allclose(tracker.current_load(clock.now + LOAD_HALF_LIFE_SECONDS), [4.0, 0.0, 4.0])
+    assert np.allclose(tracker.current_load(clock.now + 2 * LOAD_HALF_LIFE_SECONDS), [2.0, 0.0, 2.0])
+
+
+def test_rebase_keeps_load_exact(clock):
+    tracker = EdgeLoadTracker(2)
+    tracker.assign([0], flow=1.0)
+
+    # Far enough ahead that the shard epoch is rebased on the next assign
+    clock.now += 100 * LOAD_HALF_LIFE_SECONDS
+    tracker.assign([1], flow=4.0)
+    clock.now += LOAD_HALF_LIFE_SECONDS
+    tracker.assign([1], flow=1.0)
+
+    load = tracker.current_load()
+    assert np.all(np.isfinite(load))
+    assert load[0] < 1e-20
+    assert load[1] == pytest.approx(3.0)
+
+
+def test_rebase_from_another_thread_does_not_inflate(clock, monkeypatch):
+    tracker = EdgeLoadTracker(1, num_shards=2)
+    tracker.assign([0], flow=1.0)
+    clock.now += 20 * LOAD_HALF_LIFE_SECONDS
+
+    # Another thread rebases while this one is between reading its epoch
+    # and adding the scaled flow
+    real_exp = load_balancer.math.exp
+    interleaved = []
+
+    def exp_with_concurrent_rebase(x):
+        if x > 0 and not interleaved:
+            interleaved.append(True)
+            clock.now += 100 * LOAD_HALF_LIFE_SECONDS
+            other = threading.Thread(target=tracker.assign, args=([0], 1.0))
+            other.start()
+            other.join(timeout=1.0)
+        return real_exp(x)
+
+    monkeypatch.setattr(load_balancer.math, "exp", exp_with_concurrent_rebase)
+    tracker.assign([0], flow=1.0)
+    monkeypatch.setattr(load_balancer.math, "exp", real_exp)
+
+    assert interleaved
+    assert tracker.current_load()[0] == pytest.approx(1.0)
+
+
+def test_penalty_levels_are_quantized_and_capped():
+    loads = np.array([0.0, 10.0, 15.0, 20.0, 30.0, 40.0, 1000.0])
+    levels = penalty_levels(loads)
+
+    assert levels.dtype == np.int64
+    assert levels[0] == 0 and levels[1] == 0 and levels[2] == 0  # free flow up to ~15 vehicles
+    assert np.all(np.diff(levels) >= 0)
+    assert levels[-1] == MAX_PENALTY_LEVEL
+
+    # Below the cap, the level brackets the exact marginal cost
+    multipliers = marginal_cost_multiplier(loads)
+    uncapped = levels < MAX_PENALTY_LEVEL
+    assert np.all(np.power(PENALTY_STEP, levels[uncapped]) <= multipliers[uncapped] + 1e-12)
+    assert np.all(multipliers[uncapped] < np.power(PENALTY_STEP, levels[uncapped] + 1))
+
+
+def test_marginal_cost_at_capacity():
+    assert marginal_cost_multiplier(np.array([EDGE_CAPACITY]))[0] == pytest.approx(1.75)
+
+
+def test_snapshot_version_moves_only_on_level_change(clock, monkeypatch):
+    monkeypatch.setattr(load_balancer, "REFRESH_FLOW", 1.0)
+    tracker = EdgeLoadTracker(2)
+    first = tracker.snapshot()
+    assert first.version == 0
+    assert np.all(first.multipliers == 1.0)
+
+    # Below the first penalty level: refreshed, but same version
+    tracker.assign([0], flow=5.0)
+    assert tracker.snapshot().version == 0
+
+    tracker.assign([0], flow=25.0)
+    loaded = tracker.snapshot()
+    assert loaded.version == 1
+    level = penalty_levels(tracker.current_load())[0]
+    assert loaded.multipliers[0] == pytest.approx(PENALTY_STEP ** level)
+    assert loaded.multipliers[1] == 1.0
+
+    # Not refreshed yet: neither enough flow nor enough time
+    tracker.assign([1], flow=0.5)
+    assert tracker.snapshot() is loaded
+
+    tracker.reset()
+    cleared = tracker.snapshot()
+    assert cleared.version == 2
+    assert np.all(cleared.multipliers == 1.0)
@@ -0,0 +1,107 @@
+import itertools
+
+import numpy as np
+
+from pareto import ParetoPath, pareto_search, select_diverse
+
+
+# Small diamond-ish graph: 0 -> {1, 2, 3} -> 4, plus 1 -> 2 and 2 -> 3
+EDGES = [
+    (0, 1, (1.0, 5.0)),
+    (0, 2, (3.0, 3.0)),
+    (0, 3, (6.0, 1.0)),
+    (1, 4, (1.0, 5.0)),
+    (2, 4, (2.0, 2.0)),
+    (3, 4, (2.0, 1.0)),
+    (1, 2, (1.0, 1.0)),
+    (2, 3, (1.0, 0.5)),
+]
+
+
+def _graph():
+    out_edges = [[] for _ in range(5)]
+    for edge_id, (u, _, _) in enumerate(EDGES):
+        out_edges[u].append(edge_id)
+    targets = [v for _, v, _ in EDGES]
+    costs = np.array([c for _, _, c in EDGES], dtype=np.float64)
+    return out_edges, targets, costs
+
+
+def _brute_force_front(out_edges, targets, costs, source, target):
+    """Exact Pareto front (set of cost vectors) over all simple paths."""
+    found = []
+
+    def walk(node, visited, edge_ids):
+        if node == target:
+            found.append(tuple(costs[edge_ids].sum(axis=0)))
+            return
+        for edge_id in out_edges[node]:
+            nxt = targets[edge_id]
+            if nxt not in visited:
+                walk(nxt, visited | {nxt}, edge_ids + [edge_id])
+
+    walk(source, {source}, [])
+    return {
+        c for c in found
+        if not any(all(o <= x for o, x in zip(other, c)) and other != c for other in found)
+    }
+
+
+def test_exact_front_matches_brute_force():
+    out_edges, targets, costs = _graph()
+    result = pareto_search(out_edges, targets, costs, 0, 4, epsilon=0.0)
+
+    assert not result.truncated
+    assert {p.costs for p in result.paths} == _brute_force_front(out_edges, targets, costs, 0, 4)
+
+
+def test_paths_are_connected_and_costs_add_up():
+    out_edges, targets, costs = _graph()
+    sources = [u for u, _, _ in EDGES]
+    for path in pareto_search(out_edges, targets, costs, 0, 4, epsilon=0.0).paths:
+        assert sources[path.edge_ids[0]] == 0
+        assert targets[path.edge_ids[-1]] == 4
+        for a, b in zip(path.edge_ids[:-1], path.edge_ids[1:]):
+            assert targets[a] == sources[b]
+        assert np.allclose(costs[path.edge_ids].sum(axis=0), path.costs)
+
+
+def test_epsilon_keeps_front_within_tolerance():
+    out_edges, targets, costs = _graph()
+    exact = _brute_force_front(out_edges, targets, costs, 0, 4)
+    epsilon = 0.5
+    relaxed = {p.costs for p in pareto_search(out_edges, targets, costs, 0, 4, epsilon=epsilon).paths}
+
+    assert len(relaxed) <= len(exact)
+    # Every exact point is epsilon-covered by some returned point
+    for point in exact:
+        assert any(all(r <= x * (1 + epsilon) for r, x in zip(kept, point)) for kept in relaxed)
+
+
+def test_label_cap_truncates():
+    out_edges, targets, costs = _graph()
+    result = pareto_search(out_edges, targets, costs, 0, 4, epsilon=0.0, max_labels=3)
+
+    assert result.truncated
+    assert result.labels_created <= 3
+
+
+def test_unreachable_target_returns_no_paths():
+    out_edges, targets, costs = _graph()
+    result = pareto_search(out_edges, targets, costs, 4, 0)
+
+    assert result.paths == []
+    assert not result.truncated
+
+
+def test_select_diverse_keeps_best_per_criterion():
+    paths = [
+        ParetoPath(np.array([i], dtype=np.int32), (float(t), float(c)))
+        for i, (t, c) in enumerate(itertools.product(range(1, 5), range(1, 5)))
+        if t + c == 5
+    ]
+    chosen = select_diverse(paths, 2)
+
+    assert len(chosen) == 2
+    assert min(p.costs[0] for p in chosen) == 1.0
+    assert min(p.costs[1] for p in chosen) == 1.0
@@ -0,0 +1,339 @@
+"""
+Record and replay harness for Fluxora route traffic.
+
+- TrafficRecorder appends /route, /routes/multiple and /emergency-mode calls
+  to a compact append-only log (length-prefixed JSON records), plus a
+  routing state record (per-edge congestion + emergency mode) whenever
+  the congestion version changes
+- Before replaying a call recorded under another version, replay restores
+  that version's state, so diffs point at the engine rather than at
+  different live congestion
+- replay() plays a log back against the ASGI app or graph_engine directly,
+  at original speed (or a multiple of it) or as fast as possible
+- The replay report has latency percentiles and diffs against the
+  recorded results, so engine changes can be validated offline
+
+Recording is enabled by setting FLUXORA_RECORD_PATH. Replay from the
+Backend folder with:
+    python traffic_replay.py traffic.flxr --target engine --concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# File header so a replay never misreads an unrelated file
+LOG_MAGIC = b"FLXR1\n"
+
+# Little-endian uint32 payload length in front of every record
+_LENGTH = struct.Struct("<I")
+
+# Calls that change engine state; replayed in log order relative to the rest
+STATE_CHANGING_ENDPOINTS = {"/emergency-mode"}
+
+# Endpoint name of routing state records
+STATE_RECORD = "@state"
+
+
+def _compact_route(route: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the deterministic fields of a route result."""
+    if "error" in route:
+        return {"error": route["error"]}
+    return {
+        "route": route.get("route"),
+        "total_time": route.get("total_time"),
+        "congestion_score": route.get("congestion_score"),
+    }
+
+
+def compact_result(endpoint: str, result: Dict[str, Any]) -> Any:
+    """Reduce an endpoint response to what replays are compared on."""
+    if endpoint == "/routes/multiple":
+        return [_compact_route(route) for route in result.get("routes", [])]
+    if endpoint == "/emergency-mode":
+        return {"emergency_mode": result.get("emergency_mode")}
+    return _compact_route(result)
+
+
+class TrafficRecorder:
+    """Thread-safe append-only writer for the traffic log."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+        self._state_version: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _open(self):
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        handle = open(self.path, "ab")
+        if new_file:
+            handle.write(LOG_MAGIC)
+        return handle
+
+    def record(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        result: Dict[str, Any],
+        congestion_version: Optional[int],
+        started_at: float,
+    ) -> None:
+        """Append one call; started_at is the wall clock time the call began."""
+        if not self.enabled:
+            return
+        entry = {
+            "t": round(started_at, 6),
+            "e": endpoint,
+            "p": payload,
+            "v": congestion_version,
+            "l": round((time.time() - started_at) * 1000, 3),
+            "r": compact_result(endpoint, result),
+        }
+        self._write(entry)
+
+    def record_state(self, snapshot: Dict[str, Any]) -> Optional[int]:
+        """
+        Log a routing state snapshot (graph_engine.get_routing_snapshot())
+        unless its version was already logged; returns the version.
+        """
+        if not self.enabled:
+            return None
+        version = snapshot["version"]
+        entry = {
+            "t": round(time.time(), 6),
+            "e": STATE_RECORD,
+            "v": version,
+            "c": snapshot["congestion"],
+            "m": snapshot["emergency_mode"],
+        }
+        self._write(entry, state_version=version)
+        return version
+
+    def _write(self, entry: Dict[str, Any], state_version: Optional[int] = None) -> None:
+        data = json.dumps(entry, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            if state_version is not None:
+                if state_version == self._state_version:
+                    return
+                self._state_version = state_version
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(_LENGTH.pack(len(data)) + data)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Shared recorder used by routes.py
+TRAFFIC_RECORDER = TrafficRecorder(os.getenv("FLUXORA_RECORD_PATH"))
+
+
+def read_log(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records from a traffic log, stopping at a torn final record."""
+    with open(path, "rb") as handle:
+        if handle.read(len(LOG_MAGIC)) != LOG_MAGIC:
+            raise ValueError(f"{path} is not a Fluxora traffic log")
+        while True:
+            header = handle.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(header)
+            data = handle.read(length)
+            if len(data) < length:
+                return
+            yield json.loads(data)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 3)
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50_ms": _percentile(ordered, 50),
+        "p90_ms": _percentile(ordered, 90),
+        "p99_ms": _percentile(ordered, 99),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def _call_engine(endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a recorded call directly against graph_engine."""
+    import graph_engine
+
+    if endpoint == "/route":
+        return graph_engine.get_optimal_route(
+            payload["source"], payload["destination"], load_aware=payload.get("load_aware", False)
+        )
+    if endpoint == "/routes/multiple":
+        routes = graph_engine.get_multiple_routes(payload["source"], payload["destination"])
+        return {"routes": routes, "total_options": len(routes)}
+    if endpoint == "/emergency-mode":
+        graph_engine.set_emergency_mode(payload["enabled"])
+        return {"emergency_mode": graph_engine.get_emergency_mode()}
+    raise ValueError(f"Unsupported endpoint {endpoint}")
+
+
+async def replay(
+    records: List[Dict[str, Any]],
+    target: str = "engine",
+    speed: float = 0.0,
+    concurrency: int = 1,
+    max_diffs: int = 10,
+) -> Dict[str, Any]:
+    """
+    Replay recorded calls and compare against the recorded results.
+
+    - target: "asgi" (full FastAPI app in-process) or "engine" (graph_engine)
+    - speed: 0 replays as fast as possible, 1.0 at original pace, 2.0 twice as fast
+    - concurrency: maximum calls in flight at once; state-changing calls
+      (STATE_CHANGING_ENDPOINTS) are barriers: earlier calls finish first,
+      the change is applied alone, then replay continues
+    - a call recorded under a congestion version with a logged state
+      record is preceded by restoring that state (also a barrier)
+    """
+    client = None
+    if target == "asgi":
+        import httpx
+
+        from main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay")
+    elif target != "engine":
+        raise ValueError("target must be 'asgi' or 'engine'")
+
+    # Load the graph up front so the first call doesn't pay the cold start
+    import graph_engine
+
+    graph_engine.load_graph()
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: Dict[str, List[float]] = {}
+    diffs: List[Dict[str, Any]] = []
+    counts = {"replayed": 0, "matched": 0, "diffs": 0, "errors": 0, "states_restored": 0}
+    states: Dict[int, Dict[str, Any]] = {}
+    applied_version: Optional[int] = None
+    first_t = records[0]["t"] if records else 0.0
+    start = time.monotonic()
+
+    async def run_one(record: Dict[str, Any]) -> None:
+        if speed > 0:
+            delay = (record["t"] - first_t) / speed - (time.monotonic() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        async with semaphore:
+            endpoint = record["e"]
+            began = time.perf_counter()
+            try:
+                if client is not None:
+                    response = await client.post(endpoint, json=record["p"])
+                    result = response.json()
+                else:
+                    result = await asyncio.to_thread(_call_engine, endpoint, record["p"])
+            except Exception as exc:
+                counts["errors"] += 1
+                if len(diffs) < max_diffs:
+                    diffs.append({"endpoint": endpoint, "payload": record["p"], "error": repr(exc)})
+                return
+            latencies.setdefault(endpoint, []).append((time.perf_counter() - began) * 1000)
+
+        counts["replayed"] += 1
+        replayed = compact_result(endpoint, result)
+        if replayed == record["r"]:
+            counts["matched"] += 1
+            return
+        counts["diffs"] += 1
+        if len(diffs) < max_diffs:
+            diffs.append({
+                "endpoint": endpoint,
+                "payload": record["p"],
+                "congestion_version": record.get("v"),
+                "recorded": record["r"],
+                "replayed": replayed,
+            })
+
+    try:
+        pending: List[Dict[str, Any]] = []
+        for record in records:
+            if record["e"] == STATE_RECORD:
+                states[record["v"]] = record
+                continue
+            version = record.get("v")
+            if version is not None and version != applied_version and version in states:
+                await asyncio.gather(*(run_one(r) for r in pending))
+                pending = []
+                state = states[version]
+                graph_engine.restore_routing_snapshot(state["c"], state["m"])
+                applied_version = version
+                counts["states_restored"] += 1
+            if record["e"] in STATE_CHANGING_ENDPOINTS:
+                await asyncio.gather(*(run_one(r) for r in pending))
+                pending = []
+                await run_one(record)
+                applied_version = None  # local state moved on; restore again if needed
+            else:
+                pending.append(record)
+        await asyncio.gather(*(run_one(r) for r in pending))
+    finally:
+        if client is not None:
+            await client.aclose()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    recorded = [record["l"] for record in records if record.get("l") is not None]
+    return {
+        "target": target,
+        "speed": speed,
+        "concurrency": concurrency,
+        "wall_time_s": round(time.monotonic() - start, 3),
+        **counts,
+        "latency": _latency_summary(all_latencies),
+        "latency_by_endpoint": {name: _latency_summary(values) for name, values in latencies.items()},
+        "recorded_latency": _latency_summary(recorded),
+        "diff_examples": diffs,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a Fluxora traffic log.")
+    parser.add_argument("log", help="path written via FLUXORA_RECORD_PATH")
+    parser.add_argument("--target", choices=["engine", "asgi"], default="engine")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="0 = as fast as possible, 1 = original pace")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N calls")
+    args = parser.parse_args(argv)
+
+    records = list(read_log(args.log))
+    if args.limit is not None:
+        records = records[: args.limit]
+    report = asyncio.run(replay(records, args.target, args.speed, args.concurrency))
+    print(json.dumps(report, indent=2))
+
+
+__all__ = ["TrafficRecorder", "TRAFFIC_RECORDER", "read_log", "replay", "compact_result"]
+
+
+if __name__ == "__main__":
+    main()